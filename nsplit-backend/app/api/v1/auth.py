@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.database import get_db
 from app.models.user import User
@@ -26,7 +27,7 @@ class DevLoginRequest(BaseModel):
 @router.post("/dev/login", response_model=TokenResponse)
 async def dev_login(
     request: DevLoginRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Development mode login - bypasses Google OAuth"""
     if not settings.DEV_MODE:
@@ -36,7 +37,7 @@ async def dev_login(
         )
 
     # Check if user exists
-    user = db.query(User).filter(User.email == f"{request.username}@dev.local").first()
+    user = await db.scalar(select(User).where(User.email == f"{request.username}@dev.local"))
 
     if not user:
         # Create new dev user
@@ -47,15 +48,15 @@ async def dev_login(
             profile_picture_url=None,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
         # Create simulator account for new user
         await create_simulator_account(str(user.id))
     else:
         # Update last login
         user.last_login_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
 
     # Create JWT token
     access_token = create_access_token(data={"user_id": str(user.id), "email": user.email})
@@ -78,7 +79,7 @@ async def get_google_login_url():
 @router.post("/google/callback", response_model=TokenResponse)
 async def google_callback(
     request: GoogleCallbackRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Handle Google OAuth callback and create/login user"""
     # Exchange code for access token
@@ -99,7 +100,7 @@ async def google_callback(
         )
 
     # Check if user exists
-    user = db.query(User).filter(User.google_id == google_id).first()
+    user = await db.scalar(select(User).where(User.google_id == google_id))
 
     if not user:
         # Create new user
@@ -110,15 +111,15 @@ async def google_callback(
             profile_picture_url=picture,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
         # Create simulator account for new user
         await create_simulator_account(str(user.id))
     else:
         # Update last login
         user.last_login_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
 
     # Create JWT token
     access_token = create_access_token(data={"user_id": str(user.id), "email": user.email})
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
@@ -17,11 +18,11 @@ router = APIRouter(prefix="/positions", tags=["positions"])
 async def list_positions_by_session(
     session_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """List all positions for a session"""
     # Verify session exists and belongs to user
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = await db.get(SessionModel, session_id)
 
     if not session:
         raise HTTPException(
@@ -31,9 +32,9 @@ async def list_positions_by_session(
 
     verify_resource_ownership(session.user_id, current_user)
 
-    positions = db.query(Position).filter(
-        Position.session_id == session_id
-    ).order_by(Position.step_number).all()
+    positions = (await db.scalars(
+        select(Position).where(Position.session_id == session_id).order_by(Position.step_number)
+    )).all()
 
     return positions
 
@@ -42,10 +43,10 @@ async def list_positions_by_session(
 async def get_position(
     position_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get position details"""
-    position = db.query(Position).filter(Position.id == position_id).first()
+    position = await db.get(Position, position_id)
 
     if not position:
         raise HTTPException(
@@ -54,7 +55,7 @@ async def get_position(
         )
 
     # Verify session belongs to user
-    session = db.query(SessionModel).filter(SessionModel.id == position.session_id).first()
+    session = await db.get(SessionModel, position.session_id)
     verify_resource_ownership(session.user_id, current_user)
 
     return position
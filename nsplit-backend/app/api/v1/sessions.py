@@ -1,61 +1,361 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime
+from decimal import Decimal
+from functools import partial
 from uuid import UUID
+import asyncio
+import hashlib
 
+import numpy as np
+
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.models.session import Session as SessionModel
+from app.models.position import Position
 from app.models.session_event import SessionEvent
-from app.schemas.session import SessionCreate, SessionUpdate, SessionResponse, SessionDetailResponse
+from app.models.session_stats import SessionStats
+from app.schemas.session import (
+    SessionCreate,
+    SessionUpdate,
+    SessionResponse,
+    SessionDetailResponse,
+    SessionSummary,
+    SessionPnL,
+    PortfolioPnL,
+)
 from app.schemas.session_event import SessionEventResponse
+from app.schemas.sweep import SessionSuggestRequest, ParameterSuggestion
 from app.dependencies import get_current_user, verify_resource_ownership
+from app.services.event_broadcaster import event_broadcaster, format_stream_message
+from app.services.price_cache import CachedPrice, price_cache
+from app.services.simulator_client import simulator_client
+from app.strategy.sweep import DEFAULT_MAX_STEPS, DEFAULT_TRIGGER_PCTS, grid_candidates, random_candidates, run_sweep
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
+STREAM_HEARTBEAT_SECONDS = 15
+
+# Each sweep fans out over SWEEP_WORKERS processes; bounds how many run at once
+_sweep_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_sweep_semaphore() -> asyncio.Semaphore:
+    global _sweep_semaphore
+    if _sweep_semaphore is None:
+        _sweep_semaphore = asyncio.Semaphore(settings.SWEEP_MAX_CONCURRENT)
+    return _sweep_semaphore
+
 
 @router.post("", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
 async def create_session(
     session_data: SessionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a new trading session"""
     session = SessionModel(
         user_id=current_user.id,
+        stats=SessionStats(),
         **session_data.model_dump()
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
     return session
 
 
+@router.post("/suggest", response_model=List[ParameterSuggestion])
+async def suggest_parameters(
+    request: SessionSuggestRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Rank session parameters by backtesting them against the stock's prices"""
+    max_steps = request.max_steps or DEFAULT_MAX_STEPS
+    sell_trigger_pct = request.sell_trigger_pct or DEFAULT_TRIGGER_PCTS
+    buy_trigger_pct = request.buy_trigger_pct or DEFAULT_TRIGGER_PCTS
+
+    if request.search == "random":
+        candidates = random_candidates(
+            request.samples,
+            request.amount_per_step,
+            max_steps=(min(max_steps), max(max_steps)),
+            sell_trigger_pct=(min(sell_trigger_pct), max(sell_trigger_pct)),
+            buy_trigger_pct=(min(buy_trigger_pct), max(buy_trigger_pct)),
+            initial_buy_price=request.initial_buy_price,
+            seed=request.seed,
+        )
+    else:
+        candidates = grid_candidates(
+            request.amount_per_step,
+            max_steps,
+            sell_trigger_pct,
+            buy_trigger_pct,
+            request.initial_buy_price,
+        )
+
+    if len(candidates) > settings.SWEEP_MAX_CANDIDATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Parameter grid too large ({len(candidates)} > {settings.SWEEP_MAX_CANDIDATES})",
+        )
+
+    try:
+        if request.source == "simulated":
+            series = await simulator_client.generate_price_path(request.stock_code, request.steps, request.seed)
+        else:
+            series = await simulator_client.get_price_history(request.stock_code, request.history_limit)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to load prices from simulator: {str(e)}",
+        )
+
+    prices = np.array([float(price) for price in series], dtype=np.float64)
+    if len(prices) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enough price history to backtest",
+        )
+
+    # CPU-bound; keep the event loop (and the trading worker) responsive
+    loop = asyncio.get_running_loop()
+    async with _get_sweep_semaphore():
+        results = await loop.run_in_executor(
+            None,
+            partial(run_sweep, prices, candidates, workers=settings.SWEEP_WORKERS, rank_by=request.rank_by),
+        )
+
+    return [
+        ParameterSuggestion(
+            amount_per_step=result.params.amount_per_step,
+            max_steps=result.params.max_steps,
+            sell_trigger_pct=result.params.sell_trigger_pct,
+            buy_trigger_pct=result.params.buy_trigger_pct,
+            total_profit=result.total_profit,
+            realized_profit=result.realized_profit,
+            unrealized_profit=result.unrealized_profit,
+            max_drawdown=result.max_drawdown,
+            capital_utilization=result.capital_utilization,
+            completed=result.completed,
+            buys=result.buys,
+            sells=result.sells,
+        )
+        for result in results[:request.top]
+    ]
+
+
+def with_session_summaries(query, session_ids):
+    """Add per-session position and event aggregates to a sessions query as extra columns
+
+    Positions and events are grouped in subqueries limited to session_ids and
+    outer-joined back, so the whole list is answered by a single statement.
+    """
+    holding = Position.status == "holding"
+    position_totals = (
+        select(
+            Position.session_id,
+            func.sum(case((holding, 1), else_=0)).label("holding_count"),
+            func.sum(case((holding, Position.quantity), else_=0)).label("holding_quantity"),
+            func.sum(case((holding, Position.buy_price * Position.quantity), else_=0)).label("invested_amount"),
+            func.sum(Position.realized_profit).label("realized_profit"),
+        )
+        .where(Position.session_id.in_(session_ids))
+        .group_by(Position.session_id)
+        .subquery()
+    )
+    event_times = (
+        select(SessionEvent.session_id, func.max(SessionEvent.created_at).label("last_event_at"))
+        .where(SessionEvent.session_id.in_(session_ids))
+        .group_by(SessionEvent.session_id)
+        .subquery()
+    )
+    return (
+        query
+        .add_columns(
+            position_totals.c.holding_count,
+            position_totals.c.holding_quantity,
+            position_totals.c.invested_amount,
+            position_totals.c.realized_profit,
+            event_times.c.last_event_at,
+        )
+        .outerjoin(position_totals, position_totals.c.session_id == SessionModel.id)
+        .outerjoin(event_times, event_times.c.session_id == SessionModel.id)
+    )
+
+
+def _money(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
 @router.get("", response_model=List[SessionResponse])
 async def list_sessions(
     status_filter: Optional[str] = Query(None, alias="status"),
+    include_summary: bool = Query(False, description="Add position/event aggregates to each session"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """List all sessions for current user with optional status filter"""
-    query = db.query(SessionModel).filter(SessionModel.user_id == current_user.id)
+    """List all sessions for current user with optional status filter
 
+    With include_summary, each session carries its holding count/quantity,
+    invested amount, realized profit and last event time, computed in the
+    same query, so a dashboard needs no per-session position requests.
+    """
+    filters = [SessionModel.user_id == current_user.id]
     if status_filter:
-        query = query.filter(SessionModel.status == status_filter)
-
-    sessions = query.order_by(SessionModel.created_at.desc()).all()
+        filters.append(SessionModel.status == status_filter)
+
+    query = select(SessionModel).where(*filters).order_by(SessionModel.created_at.desc())
+    if not include_summary:
+        return (await db.scalars(query)).all()
+
+    rows = await db.execute(with_session_summaries(query, select(SessionModel.id).where(*filters)))
+    sessions = []
+    for session, holding_count, holding_quantity, invested_amount, realized_profit, last_event_at in rows:
+        response = SessionResponse.model_validate(session)
+        response.summary = SessionSummary(
+            holding_count=holding_count or 0,
+            holding_quantity=holding_quantity or 0,
+            invested_amount=_money(invested_amount),
+            realized_profit=_money(realized_profit),
+            last_event_at=last_event_at,
+        )
+        sessions.append(response)
     return sessions
 
 
+async def session_marks(db: AsyncSession, *filters):
+    """Holdings and realized profit of the matching sessions, grouped in one query"""
+    holding = Position.status == "holding"
+    return (await db.execute(
+        select(
+            SessionModel,
+            func.coalesce(func.sum(case((holding, Position.quantity), else_=0)), 0),
+            func.coalesce(func.sum(case((holding, Position.buy_price * Position.quantity), else_=0)), 0),
+            func.coalesce(func.sum(Position.realized_profit), 0),
+        )
+        .outerjoin(Position, Position.session_id == SessionModel.id)
+        .where(*filters)
+        .group_by(SessionModel.id)
+        .order_by(SessionModel.created_at.desc())
+    )).all()
+
+
+def mark_to_market(session: SessionModel, quantity, cost_basis, realized_profit,
+                   quote: Optional[CachedPrice]) -> SessionPnL:
+    cost_basis = _money(cost_basis)
+    realized_profit = _money(realized_profit)
+    pnl = SessionPnL(
+        session_id=session.id,
+        stock_code=session.stock_code,
+        status=session.status,
+        holding_quantity=quantity,
+        cost_basis=cost_basis,
+        realized_profit=realized_profit,
+        total_profit=realized_profit,
+    )
+    if quote is None:
+        return pnl
+
+    pnl.price = quote.price
+    pnl.price_at = quote.observed_at
+    pnl.market_value = _money(quote.price * quantity)
+    pnl.unrealized_profit = pnl.market_value - cost_basis
+    if cost_basis > 0:
+        pnl.unrealized_profit_pct = (pnl.unrealized_profit / cost_basis * 100).quantize(Decimal("0.01"))
+    pnl.total_profit = realized_profit + pnl.unrealized_profit
+    return pnl
+
+
+@router.get("/portfolio", response_model=PortfolioPnL)
+async def get_portfolio_pnl(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Profit and loss across all of the user's sessions at the cached prices
+
+    Prices come from the worker's price cache, never from the simulator, so
+    this is cheap to poll. Held stocks without a cached price are listed in
+    missing_prices and count only toward cost basis and realized profit.
+    """
+    rows = await session_marks(db, SessionModel.user_id == current_user.id)
+    quotes = await price_cache.lookup(db, {session.stock_code for session, quantity, *_ in rows if quantity})
+
+    sessions = [
+        mark_to_market(session, quantity, cost_basis, realized_profit, quotes.get(session.stock_code))
+        for session, quantity, cost_basis, realized_profit in rows
+    ]
+    priced = [pnl for pnl in sessions if pnl.market_value is not None]
+    return PortfolioPnL(
+        sessions=sessions,
+        cost_basis=sum((pnl.cost_basis for pnl in sessions), Decimal("0.00")),
+        market_value=sum((pnl.market_value for pnl in priced), Decimal("0.00")),
+        unrealized_profit=sum((pnl.unrealized_profit for pnl in priced), Decimal("0.00")),
+        realized_profit=sum((pnl.realized_profit for pnl in sessions), Decimal("0.00")),
+        total_profit=sum((pnl.total_profit for pnl in sessions), Decimal("0.00")),
+        missing_prices=sorted({pnl.stock_code for pnl in sessions if pnl.holding_quantity and pnl.price is None}),
+    )
+
+
+@router.get("/stream")
+async def stream_session_events(
+    session_id: Optional[UUID] = Query(None, description="Only this session, all of the user's sessions if omitted"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream new session events and status changes as server-sent events
+
+    Each event is sent as "event: event" with a SessionEventResponse,
+    followed by "event: session" with the session's status and current step.
+    "event: resync" means messages were dropped for a slow client, which
+    should then reload the sessions and timelines over REST.
+    """
+    user_id = current_user.id
+    # Don't pin a pooled connection for the lifetime of the stream
+    await db.close()
+
+    async def event_stream():
+        queue = event_broadcaster.subscribe(user_id)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if session_id is not None:
+                    subject = message["data"].get("session_id") or message["data"].get("id")
+                    if subject is not None and subject != str(session_id):
+                        continue
+                yield format_stream_message(message)
+        finally:
+            event_broadcaster.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{session_id}", response_model=SessionDetailResponse)
 async def get_session(
     session_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get session details with positions"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = await db.scalar(
+        select(SessionModel)
+        .where(SessionModel.id == session_id)
+        .options(selectinload(SessionModel.positions))
+    )
 
     if not session:
         raise HTTPException(
@@ -72,10 +372,10 @@ async def update_session(
     session_id: UUID,
     session_data: SessionUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update session (only allowed in 'ready' status)"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = await db.get(SessionModel, session_id)
 
     if not session:
         raise HTTPException(
@@ -96,8 +396,8 @@ async def update_session(
     for field, value in update_data.items():
         setattr(session, field, value)
 
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
     return session
 
 
@@ -105,10 +405,10 @@ async def update_session(
 async def delete_session(
     session_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete session (only allowed in 'ready' status)"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = await db.get(SessionModel, session_id)
 
     if not session:
         raise HTTPException(
@@ -124,8 +424,9 @@ async def delete_session(
             detail="Can only delete sessions in 'ready' status",
         )
 
-    db.delete(session)
-    db.commit()
+    await db.delete(session)
+    await db.commit()
+    event_broadcaster.publish_session(session, status="deleted")
     return None
 
 
@@ -133,10 +434,10 @@ async def delete_session(
 async def start_session(
     session_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Start or resume a session"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = await db.get(SessionModel, session_id)
 
     if not session:
         raise HTTPException(
@@ -170,8 +471,9 @@ async def start_session(
     )
     db.add(event)
 
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
+    event_broadcaster.publish_session(session, [event])
     return session
 
 
@@ -179,10 +481,10 @@ async def start_session(
 async def pause_session(
     session_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Pause a running session"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = await db.get(SessionModel, session_id)
 
     if not session:
         raise HTTPException(
@@ -208,19 +510,63 @@ async def pause_session(
     )
     db.add(event)
 
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
+    event_broadcaster.publish_session(session, [event])
     return session
 
 
+@router.get("/{session_id}/pnl", response_model=SessionPnL)
+async def get_session_pnl(
+    session_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Unrealized and realized profit of a session at the cached price"""
+    rows = await session_marks(db, SessionModel.id == session_id)
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found",
+        )
+
+    session, quantity, cost_basis, realized_profit = rows[0]
+    verify_resource_ownership(session.user_id, current_user)
+
+    quotes = await price_cache.lookup(db, [session.stock_code])
+    return mark_to_market(session, quantity, cost_basis, realized_profit, quotes.get(session.stock_code))
+
+
+def event_timeline_etag(event_count: int, last_created_at: Optional[datetime], *page_key) -> str:
+    """ETag of one timeline page
+
+    Events are only ever appended, so the number of matching events and the
+    newest one's time change whenever the page could have; together with the
+    page parameters they identify its content without loading it.
+    """
+    key = f"{event_count};{last_created_at.isoformat() if last_created_at else ''};{page_key}"
+    return f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
 @router.get("/{session_id}/events", response_model=List[SessionEventResponse])
 async def get_session_events(
     session_id: UUID,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; the whole timeline if omitted"),
+    cursor: Optional[UUID] = Query(None, description="X-Next-Cursor of the previous page"),
+    event_type: Optional[List[str]] = Query(None, description="Only these event types (repeatable)"),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Get session event timeline"""
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    """Get session event timeline, newest first
+
+    With a limit, pages are keyset-paginated on (created_at, id): when more
+    events follow, the X-Next-Cursor header carries the cursor for the next
+    page. Polling clients can send the ETag back in If-None-Match to get a
+    304 while nothing changed; that check only runs a count over the index.
+    """
+    session = await db.get(SessionModel, session_id)
 
     if not session:
         raise HTTPException(
@@ -230,8 +576,38 @@ async def get_session_events(
 
     verify_resource_ownership(session.user_id, current_user)
 
-    events = db.query(SessionEvent).filter(
-        SessionEvent.session_id == session_id
-    ).order_by(SessionEvent.created_at.desc()).all()
+    filters = [SessionEvent.session_id == session_id]
+    if event_type:
+        filters.append(SessionEvent.event_type.in_(event_type))
+
+    # Answer a poll for an unchanged page before loading it
+    event_count, last_created_at = (await db.execute(
+        select(func.count(SessionEvent.id), func.max(SessionEvent.created_at)).where(*filters)
+    )).one()
+    etag = event_timeline_etag(event_count, last_created_at, limit, cursor, sorted(event_type or []))
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    if cursor is not None:
+        # Compare against the stored timestamp, not a round-tripped one
+        cursor_created_at = (
+            select(SessionEvent.created_at)
+            .where(SessionEvent.id == cursor, SessionEvent.session_id == session_id)
+            .scalar_subquery()
+        )
+        filters.append(or_(
+            SessionEvent.created_at < cursor_created_at,
+            and_(SessionEvent.created_at == cursor_created_at, SessionEvent.id < cursor),
+        ))
+
+    query = select(SessionEvent).where(*filters).order_by(SessionEvent.created_at.desc(), SessionEvent.id.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    events = (await db.scalars(query)).all()
+
+    response.headers["ETag"] = etag
+    if limit is not None and len(events) > limit:
+        events = events[:limit]
+        response.headers["X-Next-Cursor"] = str(events[-1].id)
 
     return events
@@ -6,6 +6,19 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./nsplit.db"
 
+    # Connection pool (per process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; reconnect before server-side idle timeouts
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite pragmas, applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"  # readers no longer block on the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # fsync at checkpoints only; safe with WAL
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes (256 MiB)
+
     # Google OAuth (optional for development)
     GOOGLE_CLIENT_ID: Optional[str] = None
     GOOGLE_CLIENT_SECRET: Optional[str] = None
@@ -19,6 +32,29 @@ class Settings(BaseSettings):
     # Simulator
     SIMULATOR_API_URL: str = "http://localhost:8001"
     SIMULATOR_API_KEY: str = "dev-api-key"
+    SIMULATOR_TIMEOUT: float = 5.0
+    SIMULATOR_MAX_CONNECTIONS: int = 100
+    SIMULATOR_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SIMULATOR_KEEPALIVE_EXPIRY: float = 30.0
+    SIMULATOR_HTTP2: bool = True  # negotiated over TLS (ALPN); plain http stays on HTTP/1.1
+    SIMULATOR_ORDER_BATCH_WINDOW: float = 0.005  # seconds to coalesce concurrent orders into one batch
+
+    # Auto trading worker
+    WORKER_ENABLED: bool = True  # run the worker inside the API process
+    WORKER_ID: Optional[str] = None  # default: hostname:pid:random
+    WORKER_LEASE_SECONDS: int = 30
+    WORKER_INTERVAL_SECONDS: int = 5  # session refresh and default poll interval
+    WORKER_MIN_INTERVAL_SECONDS: float = 0.5  # poll interval of tickers near a trigger
+    WORKER_MAX_INTERVAL_SECONDS: float = 30.0  # poll interval of tickers far from any trigger
+    WORKER_MAX_CONCURRENCY: int = 20
+    WORKER_PRICE_MODE: str = "poll"  # poll, stream (evaluate on every simulator price push)
+    EVENT_JOURNAL_FLUSH_SECONDS: float = 1.0  # trade events are written behind the trade, this often
+    EVENT_JOURNAL_BATCH_SIZE: int = 500  # events per bulk INSERT
+
+    # Parameter sweep (POST /api/sessions/suggest)
+    SWEEP_MAX_CANDIDATES: int = 5000
+    SWEEP_WORKERS: Optional[int] = None  # default: all cores
+    SWEEP_MAX_CONCURRENT: int = 1  # sweeps running at once; later requests wait for a slot
 
     # Server
     PORT: int = 8000
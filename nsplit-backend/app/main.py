@@ -1,12 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import auth, sessions, positions
-from app.database import engine, Base
+from app.config import settings
+from app.database import close_db, init_db
+from app.services.simulator_client import simulator_client
 from app.workers.auto_trading_worker import start_worker, stop_worker
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="N-Split Trading API",
     description="Automated trading system with N-step split strategy",
@@ -20,6 +19,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Include routers
@@ -30,14 +30,20 @@ app.include_router(positions.router, prefix="/api")
 
 @app.on_event("startup")
 async def startup_event():
-    """Start background worker on startup"""
-    start_worker()
+    """Create tables, open the simulator connection pool and start background worker on startup"""
+    await init_db()
+    simulator_client.start()
+    if settings.WORKER_ENABLED:
+        start_worker()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop background worker on shutdown"""
-    stop_worker()
+    """Stop background worker and close the simulator and database connection pools on shutdown"""
+    if settings.WORKER_ENABLED:
+        await stop_worker()
+    await simulator_client.close()
+    await close_db()
 
 
 @app.get("/")
@@ -2,5 +2,8 @@ from app.models.user import User
 from app.models.session import Session
 from app.models.position import Position
 from app.models.session_event import SessionEvent
+from app.models.session_stats import SessionStats
+from app.models.ticker_price import TickerPrice
+from app.models.worker import WorkerHeartbeat
 
-__all__ = ["User", "Session", "Position", "SessionEvent"]
+__all__ = ["User", "Session", "Position", "SessionEvent", "SessionStats", "TickerPrice", "WorkerHeartbeat"]
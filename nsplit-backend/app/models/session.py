@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Integer, Numeric, ForeignKey, func, Index
+from sqlalchemy import Column, String, DateTime, Integer, Numeric, ForeignKey, func, Index, JSON
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.guid import GUID
@@ -26,6 +26,11 @@ class Session(Base):
     status = Column(String(20), nullable=False, default="ready")  # ready, running, paused, completed
     current_step = Column(Integer, nullable=False, default=0)
     first_buy_price = Column(Numeric(12, 2), nullable=True)  # Actual first buy price
+    price_ladder = Column(JSON, nullable=True)  # Per-step buy/sell prices, fixed with first_buy_price
+
+    # Worker lease: only lease_owner trades this session until lease_expires_at
+    lease_owner = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -36,9 +41,14 @@ class Session(Base):
     user = relationship("User", back_populates="sessions")
     positions = relationship("Position", back_populates="session", cascade="all, delete-orphan")
     events = relationship("SessionEvent", back_populates="session", cascade="all, delete-orphan")
+    # Small and read with every session, so always loaded alongside it
+    stats = relationship(
+        "SessionStats", back_populates="session", uselist=False, lazy="selectin", cascade="all, delete-orphan"
+    )
 
     # Indexes
     __table_args__ = (
         Index("idx_user_status", "user_id", "status"),
         Index("idx_status", "status"),
+        Index("idx_status_lease_owner", "status", "lease_owner"),
     )
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, func, Text, Integer
+from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, func, Text, Integer, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.guid import GUID
@@ -23,3 +23,11 @@ class SessionEvent(Base):
 
     # Relationships
     session = relationship("Session", back_populates="events")
+
+    # Indexes
+    __table_args__ = (
+        Index("idx_session_created", "session_id", "created_at"),
+    )
+
+    # Fetch created_at in the INSERT itself, so committed events can be streamed without a reload
+    __mapper_args__ = {"eager_defaults": True}
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, Numeric
+from sqlalchemy.orm import relationship
+from app.database import Base
+from app.models.guid import GUID
+
+
+class SessionStats(Base):
+    """Running totals of a session, updated by the worker in the same unit of work as each trade"""
+
+    __tablename__ = "session_stats"
+
+    session_id = Column(GUID(), ForeignKey("sessions.id", ondelete="CASCADE"), primary_key=True)
+
+    # P&L and capital
+    realized_profit = Column(Numeric(14, 2), nullable=False, default=0)
+    capital_deployed = Column(Numeric(14, 2), nullable=False, default=0)  # cost of the positions held now
+    max_capital_deployed = Column(Numeric(14, 2), nullable=False, default=0)
+
+    # Trades
+    buy_count = Column(Integer, nullable=False, default=0)
+    sell_count = Column(Integer, nullable=False, default=0)
+    winning_sell_count = Column(Integer, nullable=False, default=0)
+    holding_count = Column(Integer, nullable=False, default=0)
+    max_step_reached = Column(Integer, nullable=False, default=0)
+
+    # Time with at least one position held: closed stretches plus the open one
+    in_market_seconds = Column(Float, nullable=False, default=0)
+    in_market_since = Column(DateTime(timezone=True), nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    session = relationship("Session", back_populates="stats")
+
+    @property
+    def trade_count(self) -> int:
+        return self.buy_count + self.sell_count
+
+    @property
+    def win_rate(self) -> Optional[float]:
+        """Share of sells that closed at a profit (None before the first sell)"""
+        if not self.sell_count:
+            return None
+        return self.winning_sell_count / self.sell_count
+
+    @property
+    def time_in_market_seconds(self) -> float:
+        seconds = self.in_market_seconds or 0.0
+        if self.in_market_since is not None:
+            seconds += (datetime.utcnow() - self.in_market_since.replace(tzinfo=None)).total_seconds()
+        return seconds
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime, Numeric
+from app.database import Base
+
+
+class TickerPrice(Base):
+    """Last price a trading worker fetched for a stock code, for API processes without a worker"""
+
+    __tablename__ = "ticker_prices"
+
+    stock_code = Column(String(10), primary_key=True)
+    price = Column(Numeric(12, 2), nullable=False)
+    observed_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime, func
+from app.database import Base
+
+
+class WorkerHeartbeat(Base):
+    """A trading worker process; live while heartbeat_at is within the lease period"""
+
+    __tablename__ = "worker_heartbeats"
+
+    id = Column(String(64), primary_key=True)  # WORKER_ID
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=False)
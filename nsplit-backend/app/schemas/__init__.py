@@ -5,10 +5,16 @@ from app.schemas.session import (
     SessionUpdate,
     SessionResponse,
     SessionDetailResponse,
+    SessionSummary,
+    SessionStatsResponse,
+    SessionPnL,
+    PortfolioPnL,
+    PriceLadderStep,
 )
 from app.schemas.position import PositionBase, PositionResponse
 from app.schemas.session_event import SessionEventBase, SessionEventResponse
 from app.schemas.auth import TokenResponse, GoogleCallbackRequest
+from app.schemas.sweep import SessionSuggestRequest, ParameterSuggestion
 
 __all__ = [
     "UserBase",
@@ -19,10 +25,17 @@ __all__ = [
     "SessionUpdate",
     "SessionResponse",
     "SessionDetailResponse",
+    "SessionSummary",
+    "SessionStatsResponse",
+    "SessionPnL",
+    "PortfolioPnL",
+    "PriceLadderStep",
     "PositionBase",
     "PositionResponse",
     "SessionEventBase",
     "SessionEventResponse",
     "TokenResponse",
     "GoogleCallbackRequest",
+    "SessionSuggestRequest",
+    "ParameterSuggestion",
 ]
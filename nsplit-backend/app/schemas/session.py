@@ -28,6 +28,67 @@ class SessionUpdate(BaseModel):
     buy_trigger_pct: Optional[Decimal] = Field(None, ge=1, le=20)
 
 
+class PriceLadderStep(BaseModel):
+    step: int
+    buy_price: Decimal
+    sell_target_price: Decimal
+
+
+class SessionSummary(BaseModel):
+    """Position and event aggregates of a session"""
+
+    holding_count: int = 0
+    holding_quantity: int = 0
+    invested_amount: Decimal = Decimal("0")  # cost of the positions still held
+    realized_profit: Decimal = Decimal("0")
+    last_event_at: Optional[datetime] = None
+
+
+class SessionStatsResponse(BaseModel):
+    """Running totals the worker maintains with every trade"""
+
+    realized_profit: Decimal
+    capital_deployed: Decimal
+    max_capital_deployed: Decimal
+    trade_count: int
+    buy_count: int
+    sell_count: int
+    win_rate: Optional[float]
+    max_step_reached: int
+    time_in_market_seconds: float
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class SessionPnL(BaseModel):
+    """Mark-to-market of a session at the last price the worker saw"""
+
+    session_id: UUID4
+    stock_code: str
+    status: str
+    price: Optional[Decimal] = None  # None when no price has been cached for the stock yet
+    price_at: Optional[datetime] = None
+    holding_quantity: int
+    cost_basis: Decimal
+    market_value: Optional[Decimal] = None
+    unrealized_profit: Optional[Decimal] = None
+    unrealized_profit_pct: Optional[Decimal] = None
+    realized_profit: Decimal
+    total_profit: Decimal
+
+
+class PortfolioPnL(BaseModel):
+    sessions: List[SessionPnL]
+    cost_basis: Decimal
+    market_value: Decimal
+    unrealized_profit: Decimal
+    realized_profit: Decimal
+    total_profit: Decimal
+    missing_prices: List[str] = []  # held stock codes left out of market value and unrealized profit
+
+
 class SessionResponse(BaseModel):
     id: UUID4
     user_id: UUID4
@@ -44,6 +105,8 @@ class SessionResponse(BaseModel):
     created_at: datetime
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
+    summary: Optional[SessionSummary] = None  # only with include_summary
+    stats: Optional[SessionStatsResponse] = None
 
     class Config:
         from_attributes = True
@@ -51,6 +114,7 @@ class SessionResponse(BaseModel):
 
 class SessionDetailResponse(SessionResponse):
     positions: List["PositionResponse"] = []
+    price_ladder: Optional[List[PriceLadderStep]] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, Optional, List
+from decimal import Decimal
+
+# Same bounds as SessionBase, per candidate value
+AmountPerStep = Annotated[Decimal, Field(gt=0)]
+MaxSteps = Annotated[int, Field(ge=1, le=10)]
+TriggerPct = Annotated[Decimal, Field(ge=1, le=20)]
+
+
+class SessionSuggestRequest(BaseModel):
+    stock_code: str = Field(..., min_length=6, max_length=10)
+    amount_per_step: List[AmountPerStep] = Field(..., min_length=1)
+    initial_buy_price: Optional[Decimal] = None
+    # Candidate values per parameter; omitted lists use the full SessionCreate range
+    max_steps: Optional[List[MaxSteps]] = Field(None, min_length=1)
+    sell_trigger_pct: Optional[List[TriggerPct]] = Field(None, min_length=1)
+    buy_trigger_pct: Optional[List[TriggerPct]] = Field(None, min_length=1)
+    search: str = Field("grid", pattern="^(grid|random)$")
+    samples: int = Field(200, ge=1, le=5000)  # random search only
+    source: str = Field("history", pattern="^(history|simulated)$")
+    history_limit: int = Field(10000, ge=2, le=100000)
+    steps: int = Field(10000, ge=1, le=100000)  # simulated paths only
+    seed: Optional[int] = None
+    rank_by: str = Field("total_profit", pattern="^(total_profit|return_on_drawdown|capital_utilization)$")
+    top: int = Field(10, ge=1, le=100)
+
+
+class ParameterSuggestion(BaseModel):
+    amount_per_step: Decimal
+    max_steps: int
+    sell_trigger_pct: Decimal
+    buy_trigger_pct: Decimal
+    total_profit: Decimal
+    realized_profit: Decimal
+    unrealized_profit: Decimal
+    max_drawdown: Decimal
+    capital_utilization: float
+    completed: bool
+    buys: int
+    sells: int
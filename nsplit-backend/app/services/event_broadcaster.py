@@ -0,0 +1,77 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.models.session import Session as SessionModel
+from app.models.session_event import SessionEvent
+from app.schemas.session_event import SessionEventResponse
+
+
+class SessionEventBroadcaster:
+    """Fans out session events and status changes to each user's stream subscribers
+
+    The session routes publish right after their commit, and the worker's
+    event journal once it has written the events, on the application's event
+    loop. Only subscribers in the same process are reached, so trades show
+    up in an API process's streams when it runs the worker
+    (WORKER_ENABLED=true). A subscriber that falls
+    queue_size messages behind has its backlog replaced by a single resync
+    message, after which it should reload over REST.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    def subscribe(self, user_id) -> asyncio.Queue:
+        """Register a subscriber queue for one user's sessions"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[str(user_id)].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id, queue: asyncio.Queue):
+        """Remove a subscriber queue"""
+        queues = self._subscribers.get(str(user_id))
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[str(user_id)]
+
+    def publish(self, user_id, message_type: str, data: Dict[str, Any]):
+        """Deliver one message to every subscriber of the user"""
+        message = {"type": message_type, "data": data}
+        for queue in self._subscribers.get(str(user_id), ()):
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync", "data": {}})
+            else:
+                queue.put_nowait(message)
+
+    def publish_session(self, session: SessionModel, events: Iterable[SessionEvent] = (), status: Optional[str] = None):
+        """Publish a session's committed events followed by its current status"""
+        self.publish_status(session.user_id, session.id, status or session.status, session.current_step, events)
+
+    def publish_status(self, user_id, session_id, status: str, current_step: int, events: Iterable[Any] = ()):
+        """Publish written events, as models or column dicts, followed by the session's status"""
+        if not self._subscribers.get(str(user_id)):
+            return
+
+        for event in events:
+            self.publish(user_id, "event", SessionEventResponse.model_validate(event).model_dump(mode="json"))
+        self.publish(user_id, "session", {
+            "id": str(session_id),
+            "status": status,
+            "current_step": current_step,
+        })
+
+
+def format_stream_message(message: Dict[str, Any]) -> str:
+    """Format one broadcaster message as a server-sent event"""
+    return f"event: {message['type']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+# Singleton instance
+event_broadcaster = SessionEventBroadcaster()
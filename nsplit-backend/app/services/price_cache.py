@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ticker_price import TickerPrice
+
+
+@dataclass(frozen=True)
+class CachedPrice:
+    price: Decimal
+    observed_at: datetime
+
+
+class PriceCache:
+    """Last price per stock code, fed by the trading worker's own price fetches
+
+    Reads never call the simulator. The worker updates the in-memory map on
+    every tick and periodically flushes the changed codes to ticker_prices,
+    so API processes running without a worker (WORKER_ENABLED=false), or
+    whose worker does not trade a ticker, see the same prices a flush
+    interval behind. Lookups use whichever of the two is fresher.
+    """
+
+    def __init__(self):
+        self._prices: Dict[str, CachedPrice] = {}
+        self._dirty: Set[str] = set()
+
+    def update(self, prices: Dict[str, Decimal], observed_at: Optional[datetime] = None):
+        """Record freshly fetched prices"""
+        observed_at = observed_at or datetime.utcnow()
+        for stock_code, price in prices.items():
+            self._prices[stock_code] = CachedPrice(price, observed_at)
+            self._dirty.add(stock_code)
+
+    def get(self, stock_code: str) -> Optional[CachedPrice]:
+        return self._prices.get(stock_code)
+
+    def retain(self, stock_codes: Iterable[str]):
+        """Forget the tickers this worker no longer trades, once their last price was flushed"""
+        keep = set(stock_codes) | self._dirty
+        for stock_code in [code for code in self._prices if code not in keep]:
+            del self._prices[stock_code]
+
+    async def flush(self, db: AsyncSession):
+        """Write the prices that changed since the last flush"""
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+
+        try:
+            for stock_code in dirty:
+                cached = self._prices[stock_code]
+                await db.merge(TickerPrice(stock_code=stock_code, price=cached.price, observed_at=cached.observed_at))
+            await db.commit()
+        except Exception:
+            self._dirty |= dirty
+            raise
+
+    async def lookup(self, db: AsyncSession, stock_codes: Iterable[str]) -> Dict[str, CachedPrice]:
+        """Freshest cached price of each code, from this process or from ticker_prices
+
+        Another worker may hold a ticker's sessions now, in which case the
+        flushed row is newer than what this process last saw.
+        """
+        codes = set(stock_codes)
+        if not codes:
+            return {}
+
+        found = {code: self._prices[code] for code in codes if code in self._prices}
+        for row in await db.scalars(select(TickerPrice).where(TickerPrice.stock_code.in_(codes))):
+            stored = CachedPrice(row.price, row.observed_at)
+            cached = found.get(row.stock_code)
+            if cached is None or _naive(stored.observed_at) > _naive(cached.observed_at):
+                found[row.stock_code] = stored
+        return found
+
+
+def _naive(value: datetime) -> datetime:
+    """UTC timestamps compare naive; PostgreSQL returns them timezone-aware"""
+    return value.replace(tzinfo=None)
+
+
+# Singleton instance
+price_cache = PriceCache()
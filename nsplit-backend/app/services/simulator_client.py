@@ -1,8 +1,10 @@
 import httpx
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, AsyncIterator, Set, Tuple
 from decimal import Decimal
 from app.config import settings
 import asyncio
+import json
+import uuid
 
 
 class SimulatorClient:
@@ -11,30 +13,62 @@ class SimulatorClient:
     def __init__(self):
         self.base_url = settings.SIMULATOR_API_URL
         self.api_key = settings.SIMULATOR_API_KEY
-        self.timeout = 5.0
+        self.timeout = settings.SIMULATOR_TIMEOUT
         self.max_retries = 3
+        self.price_batch_size = 100
+        self.stream_read_timeout = 30.0  # simulator sends a heartbeat every 15s
+        self.order_batch_size = 1000  # simulator limit per /api/order/batch request
+        self.order_batch_window = settings.SIMULATOR_ORDER_BATCH_WINDOW
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Orders waiting for the next coalesced batch request
+        self._pending_orders: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
 
     def _get_headers(self) -> Dict[str, str]:
         return {"X-Simulator-API-Key": self.api_key}
 
+    def start(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client shared by all requests"""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=settings.SIMULATOR_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SIMULATOR_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.SIMULATOR_KEEPALIVE_EXPIRY,
+            )
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits, http2=settings.SIMULATOR_HTTP2)
+        return self._client
+
+    async def close(self):
+        """Close the pooled HTTP client and its keep-alive connections"""
+        # Send orders still waiting for a batch before the pool goes away
+        self._flush_orders()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def _retry_request(self, method: str, url: str, **kwargs) -> httpx.Response:
         """Make HTTP request with exponential backoff retry"""
+        client = self.start()
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    if method == "GET":
-                        response = await client.get(url, **kwargs)
-                    elif method == "POST":
-                        response = await client.post(url, **kwargs)
-                    else:
-                        raise ValueError(f"Unsupported HTTP method: {method}")
-
-                    if response.status_code in [200, 201]:
-                        return response
-                    elif attempt < self.max_retries - 1:
-                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                    else:
-                        response.raise_for_status()
+                if method == "GET":
+                    response = await client.get(url, **kwargs)
+                elif method == "POST":
+                    response = await client.post(url, **kwargs)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+
+                if response.status_code in [200, 201]:
+                    return response
+                elif attempt < self.max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                else:
+                    response.raise_for_status()
 
             except httpx.HTTPError as e:
                 if attempt < self.max_retries - 1:
@@ -51,20 +85,92 @@ class SimulatorClient:
         data = response.json()
         return Decimal(str(data["price"]))
 
+    async def get_current_prices(self, stock_codes: List[str]) -> Dict[str, Decimal]:
+        """Get current prices for several stocks, one request per batch of codes"""
+        codes = list(dict.fromkeys(stock_codes))
+        prices: Dict[str, Decimal] = {}
+        url = f"{self.base_url}/api/price"
+
+        for i in range(0, len(codes), self.price_batch_size):
+            batch = codes[i:i + self.price_batch_size]
+            response = await self._retry_request(
+                "GET",
+                url,
+                headers=self._get_headers(),
+                params={"codes": ",".join(batch)},
+            )
+            for item in response.json():
+                prices[item["stock_code"]] = Decimal(str(item["price"]))
+
+        return prices
+
+    async def get_price_history(self, stock_code: str, limit: int = 100) -> List[Decimal]:
+        """Get a stock's recorded price history, oldest first"""
+        url = f"{self.base_url}/api/price/{stock_code}/history"
+        response = await self._retry_request(
+            "GET",
+            url,
+            headers=self._get_headers(),
+            params={"limit": limit},
+        )
+        return [Decimal(str(item["price"])) for item in reversed(response.json())]
+
+    async def generate_price_path(self, stock_code: str, steps: int, seed: Optional[int] = None) -> List[float]:
+        """Get a simulated price path from the stock's current price (steps + 1 prices)"""
+        url = f"{self.base_url}/api/price/{stock_code}/paths"
+        params: Dict[str, Any] = {"steps": steps}
+        if seed is not None:
+            params["seed"] = seed
+        response = await self._retry_request(
+            "GET",
+            url,
+            headers=self._get_headers(),
+            params=params,
+        )
+        return response.json()["prices"]
+
+    async def stream_prices(self, stock_codes: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Decimal]]:
+        """Subscribe to the simulator price stream, yielding each tick's prices"""
+        url = f"{self.base_url}/api/price/stream"
+        params = {"codes": ",".join(stock_codes)} if stock_codes else None
+        timeout = httpx.Timeout(self.timeout, read=self.stream_read_timeout)
+
+        client = self.start()
+        async with client.stream("GET", url, headers=self._get_headers(), params=params, timeout=timeout) as response:
+            response.raise_for_status()
+
+            data_lines: List[str] = []
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    data_lines.append(line[5:].strip())
+                elif not line and data_lines:
+                    data = json.loads("\n".join(data_lines))
+                    data_lines = []
+                    yield {
+                        item["stock_code"]: Decimal(str(item["price"]))
+                        for item in data["prices"]
+                    }
+
     async def place_buy_order(
         self,
         user_id: str,
         stock_code: str,
         price: Decimal,
         quantity: int,
+        idempotency_key: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Place a buy order"""
+        """Place a buy order
+
+        The idempotency key is sent with every retry, so the simulator fills
+        the order at most once and replays the original fill afterwards.
+        """
         url = f"{self.base_url}/api/order/buy"
         payload = {
             "user_id": user_id,
             "stock_code": stock_code,
             "price": float(price),
             "quantity": quantity,
+            "idempotency_key": idempotency_key or str(uuid.uuid4()),
         }
         response = await self._retry_request(
             "POST",
@@ -80,14 +186,20 @@ class SimulatorClient:
         stock_code: str,
         price: Decimal,
         quantity: int,
+        idempotency_key: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Place a sell order"""
+        """Place a sell order
+
+        The idempotency key is sent with every retry, so the simulator fills
+        the order at most once and replays the original fill afterwards.
+        """
         url = f"{self.base_url}/api/order/sell"
         payload = {
             "user_id": user_id,
             "stock_code": stock_code,
             "price": float(price),
             "quantity": quantity,
+            "idempotency_key": idempotency_key or str(uuid.uuid4()),
         }
         response = await self._retry_request(
             "POST",
@@ -97,6 +209,94 @@ class SimulatorClient:
         )
         return response.json()
 
+    @staticmethod
+    def build_order(
+        order_type: str,
+        user_id: str,
+        stock_code: str,
+        price: Decimal,
+        quantity: int,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build one item of a batch order request"""
+        return {
+            "order_type": order_type,
+            "user_id": user_id,
+            "stock_code": stock_code,
+            "price": float(price),
+            "quantity": quantity,
+            "idempotency_key": idempotency_key or str(uuid.uuid4()),
+        }
+
+    async def place_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Place many orders through the simulator's batch endpoint
+
+        Returns one result per order ({status, status_code, order, error});
+        a rejected order does not fail the others. Every order carries an
+        idempotency key, so retrying a batch replays its fills.
+        """
+        url = f"{self.base_url}/api/order/batch"
+        results: List[Dict[str, Any]] = []
+        for i in range(0, len(orders), self.order_batch_size):
+            batch = [
+                {**order, "idempotency_key": order.get("idempotency_key") or str(uuid.uuid4())}
+                for order in orders[i:i + self.order_batch_size]
+            ]
+            response = await self._retry_request(
+                "POST",
+                url,
+                headers=self._get_headers(),
+                json={"orders": batch},
+            )
+            results.extend(response.json())
+        return results
+
+    async def submit_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Place orders through a shared micro-batcher
+
+        Orders submitted within SIMULATOR_ORDER_BATCH_WINDOW of each other,
+        e.g. by every session one price move triggers, go out as a single
+        batch request and a single simulator transaction. Results come back
+        in the order given.
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+        for order in orders:
+            future = loop.create_future()
+            self._pending_orders.append((order, future))
+            futures.append(future)
+
+        if len(self._pending_orders) >= self.order_batch_size:
+            self._flush_orders()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.order_batch_window, self._flush_orders)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush_orders(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending_orders = self._pending_orders, []
+        if pending:
+            task = asyncio.get_running_loop().create_task(self._send_orders(pending))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_orders(self, pending: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            results = await self.place_orders([order for order, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
     async def get_account_balance(self, user_id: str) -> Dict[str, Any]:
         """Get account balance"""
         url = f"{self.base_url}/api/account/{user_id}"
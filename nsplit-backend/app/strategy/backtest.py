@@ -0,0 +1,364 @@
+import argparse
+import asyncio
+import csv
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from app.strategy.evaluator import evaluate_ladder, next_trigger_prices
+from app.strategy.ladder import LadderStep, build_price_ladder
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """N-split settings, mirroring the strategy fields of SessionCreate"""
+
+    amount_per_step: Decimal
+    max_steps: int
+    sell_trigger_pct: Decimal
+    buy_trigger_pct: Decimal
+    initial_buy_price: Optional[Decimal] = None
+
+
+@dataclass
+class BacktestPosition:
+    step_number: int
+    buy_price: Decimal
+    quantity: int
+    sell_target_price: Decimal
+    buy_tick: int
+    sell_price: Optional[Decimal] = None
+    sell_tick: Optional[int] = None
+    realized_profit: Optional[Decimal] = None
+    status: str = "holding"  # holding, sold
+
+
+@dataclass(frozen=True)
+class BacktestEvent:
+    tick: int
+    event_type: str  # buy, sell, complete
+    price: Decimal
+    step: Optional[int] = None
+    quantity: Optional[int] = None
+
+
+@dataclass
+class BacktestResult:
+    params: StrategyParams
+    ticks: int
+    positions: List[BacktestPosition] = field(default_factory=list)
+    events: List[BacktestEvent] = field(default_factory=list)
+    completed: bool = False
+    last_price: Optional[Decimal] = None
+    realized_profit: Decimal = Decimal('0')
+    unrealized_profit: Decimal = Decimal('0')
+    max_drawdown: Decimal = Decimal('0')  # largest peak-to-trough drop of marked-to-market equity
+    max_capital_deployed: Decimal = Decimal('0')
+    capital_utilization: float = 0.0  # time-weighted deployed capital / (amount_per_step * max_steps)
+
+    @property
+    def total_profit(self) -> Decimal:
+        return self.realized_profit + self.unrealized_profit
+
+    def summary(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "completed": self.completed,
+            "buys": sum(1 for event in self.events if event.event_type == "buy"),
+            "sells": sum(1 for event in self.events if event.event_type == "sell"),
+            "holding": sum(1 for position in self.positions if position.status == "holding"),
+            "last_price": str(self.last_price) if self.last_price is not None else None,
+            "realized_profit": str(self.realized_profit),
+            "unrealized_profit": str(self.unrealized_profit),
+            "total_profit": str(self.total_profit),
+            "max_drawdown": str(self.max_drawdown),
+            "max_capital_deployed": str(self.max_capital_deployed),
+            "capital_utilization": round(self.capital_utilization, 4),
+        }
+
+
+class Backtest:
+    """Streams a price series through the N-split strategy without DB or HTTP
+
+    Between trades a session only reacts when the price crosses its next buy
+    or sell level, so quiet ticks are skipped with a vectorized scan and the
+    strategy core only runs on ticks that can change the session. Equity and
+    deployed capital are constant-coefficient between trades, so drawdown
+    and capital utilization are accumulated per segment with array ops.
+    """
+
+    def __init__(self, params: StrategyParams, max_scan_chunk: int = 1 << 16):
+        self.params = params
+        self.max_scan_chunk = max_scan_chunk
+        self.ladder: Optional[List[LadderStep]] = None
+        self.positions: List[BacktestPosition] = []
+        self.holdings: List[BacktestPosition] = []
+        self.events: List[BacktestEvent] = []
+        self.current_step = 0
+        self.completed = False
+        self.ticks = 0
+        self.last_price: Optional[float] = None
+        self._buy_at_or_below = -np.inf
+        self._sell_at_or_above = np.inf
+
+        # Running metrics (floats; converted to Decimal in result())
+        self.active_ticks = 0  # ticks until completion
+        self._realized = 0.0
+        self._held_quantity = 0
+        self._cost_basis = 0.0
+        self._equity_peak = 0.0
+        self._max_drawdown = 0.0
+        self._max_capital_deployed = 0.0
+        self._capital_ticks = 0.0
+
+    def feed(self, prices: Union[np.ndarray, Iterable[float]]):
+        """Process the next chunk of the price series"""
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.size == 0 or self.completed:
+            return
+
+        i = 0
+        segment_start = 0  # first tick priced with the current holdings
+        while i < len(prices) and not self.completed:
+            if self.ladder is not None:
+                i = self._find_next_trigger(prices, i)
+                if i is None:
+                    break
+            self._account(prices, segment_start, i)
+            self._evaluate(self.ticks + i, float(prices[i]))
+            segment_start = i
+            i += 1
+
+        end = segment_start + 1 if self.completed else len(prices)
+        self._account(prices, segment_start, end)
+        self.active_ticks += end
+        self.ticks += len(prices)
+        self.last_price = float(prices[end - 1])
+
+    def _account(self, prices: np.ndarray, start: int, end: int):
+        """Accumulate drawdown and deployed capital over ticks with unchanged holdings"""
+        if end <= start:
+            return
+
+        self._capital_ticks += self._cost_basis * (end - start)
+
+        if self._held_quantity:
+            equity = (self._realized - self._cost_basis) + self._held_quantity * prices[start:end]
+            peaks = np.maximum(np.maximum.accumulate(equity), self._equity_peak)
+            self._max_drawdown = max(self._max_drawdown, float((peaks - equity).max()))
+            self._equity_peak = float(peaks[-1])
+        else:
+            self._equity_peak = max(self._equity_peak, self._realized)
+            self._max_drawdown = max(self._max_drawdown, self._equity_peak - self._realized)
+
+    def _find_next_trigger(self, prices: np.ndarray, start: int) -> Optional[int]:
+        chunk = 256
+        while start < len(prices):
+            segment = prices[start:start + chunk]
+            hits = (segment <= self._buy_at_or_below) | (segment >= self._sell_at_or_above)
+            index = int(hits.argmax())
+            if hits[index]:
+                return start + index
+            start += len(segment)
+            chunk = min(chunk * 4, self.max_scan_chunk)
+        return None
+
+    def _evaluate(self, tick: int, price_value: float):
+        price = Decimal(repr(price_value))
+
+        if self.ladder is None:
+            first_buy_price = self.params.initial_buy_price or price
+            self.ladder = build_price_ladder(
+                first_buy_price,
+                self.params.max_steps,
+                self.params.buy_trigger_pct,
+                self.params.sell_trigger_pct,
+            )
+
+        evaluation = evaluate_ladder(
+            self.ladder,
+            self.holdings,
+            price,
+            self.params.amount_per_step,
+            self.current_step,
+        )
+
+        for sell in evaluation.sells:
+            position = sell.holding
+            position.sell_price = sell.price
+            position.sell_tick = tick
+            position.realized_profit = (sell.price - position.buy_price) * position.quantity
+            position.status = "sold"
+            self.holdings.remove(position)
+            self._realized += float(position.realized_profit)
+            self._held_quantity -= position.quantity
+            self._cost_basis -= float(position.buy_price * position.quantity)
+            self.events.append(BacktestEvent(
+                tick=tick,
+                event_type="sell",
+                price=sell.price,
+                step=position.step_number,
+                quantity=position.quantity,
+            ))
+
+        if evaluation.completed:
+            self.completed = True
+            self.events.append(BacktestEvent(tick=tick, event_type="complete", price=price))
+            return
+
+        for buy in evaluation.buys:
+            position = BacktestPosition(
+                step_number=buy.step,
+                buy_price=buy.price,
+                quantity=buy.quantity,
+                sell_target_price=buy.sell_target_price,
+                buy_tick=tick,
+            )
+            self.positions.append(position)
+            self.holdings.append(position)
+            self.current_step = max(self.current_step, buy.step)
+            self._held_quantity += buy.quantity
+            self._cost_basis += float(buy.price * buy.quantity)
+            self._max_capital_deployed = max(self._max_capital_deployed, self._cost_basis)
+            self.events.append(BacktestEvent(
+                tick=tick,
+                event_type="buy",
+                price=buy.price,
+                step=buy.step,
+                quantity=buy.quantity,
+            ))
+
+        buy_at_or_below, sell_at_or_above = next_trigger_prices(
+            self.ladder,
+            self.holdings,
+            self.params.amount_per_step,
+        )
+        self._buy_at_or_below = float(buy_at_or_below) if buy_at_or_below is not None else -np.inf
+        self._sell_at_or_above = float(sell_at_or_above) if sell_at_or_above is not None else np.inf
+
+    def result(self) -> BacktestResult:
+        last_price = Decimal(repr(self.last_price)) if self.last_price is not None else None
+        realized = sum(
+            (position.realized_profit for position in self.positions if position.realized_profit is not None),
+            Decimal('0'),
+        )
+        unrealized = Decimal('0')
+        if last_price is not None:
+            unrealized = sum(
+                ((last_price - position.buy_price) * position.quantity for position in self.holdings),
+                Decimal('0'),
+            )
+
+        budget = self.params.amount_per_step * self.params.max_steps
+        capital_utilization = 0.0
+        if self.active_ticks and budget > 0:
+            capital_utilization = self._capital_ticks / (float(budget) * self.active_ticks)
+
+        return BacktestResult(
+            params=self.params,
+            ticks=self.ticks,
+            positions=list(self.positions),
+            events=list(self.events),
+            completed=self.completed,
+            last_price=last_price,
+            realized_profit=realized,
+            unrealized_profit=unrealized,
+            max_drawdown=Decimal(str(round(self._max_drawdown, 2))),
+            max_capital_deployed=Decimal(str(round(self._max_capital_deployed, 2))),
+            capital_utilization=capital_utilization,
+        )
+
+
+def run_backtest(
+    params: StrategyParams,
+    prices: Union[np.ndarray, Iterable[np.ndarray]],
+) -> BacktestResult:
+    """Run a backtest over a price array or a stream of price chunks"""
+    backtest = Backtest(params)
+    if isinstance(prices, np.ndarray):
+        backtest.feed(prices)
+    else:
+        for chunk in prices:
+            backtest.feed(chunk)
+            if backtest.completed:
+                break
+    return backtest.result()
+
+
+def load_csv_prices(path: str, column: str = "price", chunk_size: int = 100_000) -> Iterator[np.ndarray]:
+    """Stream prices from a CSV file with a header row, in chunks"""
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        chunk: List[float] = []
+        for row in reader:
+            chunk.append(float(row[column]))
+            if len(chunk) >= chunk_size:
+                yield np.array(chunk, dtype=np.float64)
+                chunk = []
+        if chunk:
+            yield np.array(chunk, dtype=np.float64)
+
+
+def load_parquet_prices(path: str, column: str = "price") -> Iterator[np.ndarray]:
+    """Stream prices from a Parquet file, one row group at a time (requires pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Reading Parquet price series requires pyarrow (pip install pyarrow)")
+
+    parquet_file = pq.ParquetFile(path)
+    for i in range(parquet_file.num_row_groups):
+        table = parquet_file.read_row_group(i, columns=[column])
+        yield table.column(column).to_numpy().astype(np.float64)
+
+
+async def load_simulator_prices(stock_code: str, limit: int) -> np.ndarray:
+    """Load a stock's recorded SimPriceHistory series from the simulator, oldest first"""
+    from app.services.simulator_client import simulator_client
+
+    try:
+        history = await simulator_client.get_price_history(stock_code, limit)
+    finally:
+        await simulator_client.close()
+    return np.array([float(price) for price in history], dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the N-split strategy over a price series")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV file with a header row")
+    source.add_argument("--parquet", help="Parquet file")
+    source.add_argument("--stock-code", help="Replay the simulator's SimPriceHistory for this stock")
+    parser.add_argument("--column", default="price", help="Price column for CSV/Parquet input")
+    parser.add_argument("--limit", type=int, default=100000, help="History rows to load from the simulator")
+    parser.add_argument("--amount-per-step", type=Decimal, required=True)
+    parser.add_argument("--max-steps", type=int, required=True)
+    parser.add_argument("--sell-trigger-pct", type=Decimal, required=True)
+    parser.add_argument("--buy-trigger-pct", type=Decimal, required=True)
+    parser.add_argument("--initial-buy-price", type=Decimal, default=None)
+    args = parser.parse_args()
+
+    params = StrategyParams(
+        amount_per_step=args.amount_per_step,
+        max_steps=args.max_steps,
+        sell_trigger_pct=args.sell_trigger_pct,
+        buy_trigger_pct=args.buy_trigger_pct,
+        initial_buy_price=args.initial_buy_price,
+    )
+
+    if args.csv:
+        prices = load_csv_prices(args.csv, args.column)
+    elif args.parquet:
+        prices = load_parquet_prices(args.parquet, args.column)
+    else:
+        prices = asyncio.run(load_simulator_prices(args.stock_code, args.limit))
+
+    result = run_backtest(params, prices)
+    print(json.dumps(result.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import math
+from decimal import Decimal
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.strategy.evaluator import Holding
+from app.strategy.ladder import LadderStep
+
+
+class LadderBook:
+    """Ladder state of every session on one ticker, laid out as NumPy arrays
+
+    Row i holds one session; column j its step j + 1. buy_prices carries the
+    rungs evaluate_ladder could buy (unheld, shallower than the lowest held
+    step, affordable) and -inf elsewhere; sell_targets carries held rungs'
+    targets and +inf elsewhere. A price then triggers exactly the rows with a
+    buy price at or above it or a sell target at or below it; the row-wise
+    max/min of the two matrices are kept alongside, so one vectorized pass
+    over two columns finds the few sessions worth a full evaluation.
+
+    Sessions without a ladder yet, or with nothing held after their first
+    buy (pending completion), are always reported.
+    """
+
+    def __init__(self, width: int = 10, initial_capacity: int = 64):
+        self._index: Dict[Hashable, int] = {}  # session id -> row
+        self._ids: List[Hashable] = []
+        self._buy_prices = np.full((initial_capacity, width), -np.inf)
+        self._sell_targets = np.full((initial_capacity, width), np.inf)
+        self._buy_levels = np.full(initial_capacity, -np.inf)  # row max of _buy_prices
+        self._sell_levels = np.full(initial_capacity, np.inf)  # row min of _sell_targets
+        self._always = np.zeros(initial_capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, session_id: Hashable) -> bool:
+        return session_id in self._index
+
+    @property
+    def session_ids(self) -> List[Hashable]:
+        return list(self._ids)
+
+    def _reserve(self, rows: int, width: int):
+        capacity, current_width = self._buy_prices.shape
+        if rows <= capacity and width <= current_width:
+            return
+
+        capacity = max(capacity, 1)
+        while capacity < rows:
+            capacity *= 2
+        width = max(width, current_width)
+
+        count = len(self._ids)
+        buy_prices = np.full((capacity, width), -np.inf)
+        sell_targets = np.full((capacity, width), np.inf)
+        buy_levels = np.full(capacity, -np.inf)
+        sell_levels = np.full(capacity, np.inf)
+        always = np.zeros(capacity, dtype=bool)
+        buy_prices[:count, :current_width] = self._buy_prices[:count]
+        sell_targets[:count, :current_width] = self._sell_targets[:count]
+        buy_levels[:count] = self._buy_levels[:count]
+        sell_levels[:count] = self._sell_levels[:count]
+        always[:count] = self._always[:count]
+        self._buy_prices, self._sell_targets = buy_prices, sell_targets
+        self._buy_levels, self._sell_levels, self._always = buy_levels, sell_levels, always
+
+    def upsert(
+        self,
+        session_id: Hashable,
+        ladder: Optional[Sequence[LadderStep]],
+        holdings: Sequence[Holding],
+        amount_per_step: Decimal,
+        current_step: int,
+    ):
+        """Add a session or replace its row with its current ladder state"""
+        row = self._index.get(session_id)
+        if row is None:
+            row = len(self._ids)
+            self._reserve(row + 1, len(ladder) if ladder else 0)
+            self._index[session_id] = row
+            self._ids.append(session_id)
+        elif ladder:
+            self._reserve(len(self._ids), len(ladder))
+
+        self._buy_prices[row] = -np.inf
+        self._sell_targets[row] = np.inf
+        self._buy_levels[row] = -np.inf
+        self._sell_levels[row] = np.inf
+        self._always[row] = ladder is None or (not holdings and current_step > 0)
+        if ladder is None:
+            return
+
+        for holding in holdings:
+            self._sell_targets[row, holding.step_number - 1] = float(holding.sell_target_price)
+
+        # Same buy eligibility as evaluate_ladder
+        lowest_held_step = min((holding.step_number for holding in holdings), default=None)
+        for rung in ladder:
+            if lowest_held_step is not None and rung.step >= lowest_held_step:
+                break
+            if int(amount_per_step / rung.buy_price) > 0:
+                self._buy_prices[row, rung.step - 1] = float(rung.buy_price)
+
+        self._buy_levels[row] = self._buy_prices[row].max()
+        self._sell_levels[row] = self._sell_targets[row].min()
+
+    def remove(self, session_id: Hashable):
+        """Drop a session, moving the last row into its slot"""
+        row = self._index.pop(session_id, None)
+        if row is None:
+            return
+
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._index[moved] = row
+            self._buy_prices[row] = self._buy_prices[last]
+            self._sell_targets[row] = self._sell_targets[last]
+            self._buy_levels[row] = self._buy_levels[last]
+            self._sell_levels[row] = self._sell_levels[last]
+            self._always[row] = self._always[last]
+        self._ids.pop()
+
+    def retain(self, session_ids: Iterable[Hashable]):
+        """Drop every session not in session_ids (e.g. paused or completed)"""
+        keep = set(session_ids)
+        for session_id in [session_id for session_id in self._ids if session_id not in keep]:
+            self.remove(session_id)
+
+    def triggered(self, price: float) -> List[Hashable]:
+        """Sessions whose evaluation at this price would trade or complete"""
+        count = len(self._ids)
+        if count == 0:
+            return []
+
+        hits = (
+            self._always[:count]
+            | (self._buy_levels[:count] >= price)
+            | (self._sell_levels[:count] <= price)
+        )
+        return [self._ids[row] for row in np.flatnonzero(hits)]
+
+    def nearest_trigger_distance(self, price: float) -> float:
+        """Relative price move needed before any session would act (0 if one already would)"""
+        count = len(self._ids)
+        if count == 0 or price <= 0:
+            return math.inf
+        if self._always[:count].any():
+            return 0.0
+
+        gap = min(
+            price - self._buy_levels[:count].max(),
+            self._sell_levels[:count].min() - price,
+        )
+        return max(float(gap), 0.0) / price
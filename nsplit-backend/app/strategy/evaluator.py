@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import List, Optional, Protocol, Sequence, Tuple
+
+from app.strategy.ladder import LadderStep, deepest_triggered_step
+
+
+class Holding(Protocol):
+    """A held position as seen by the strategy (Position rows satisfy this)"""
+
+    step_number: int
+    buy_price: Decimal
+    quantity: int
+    sell_target_price: Decimal
+
+
+@dataclass(frozen=True)
+class BuyDecision:
+    step: int
+    price: Decimal
+    quantity: int
+    sell_target_price: Decimal
+
+
+@dataclass(frozen=True)
+class SellDecision:
+    holding: Holding
+    price: Decimal
+
+
+@dataclass
+class Evaluation:
+    """Everything a session should do at one price, in execution order"""
+
+    sells: List[SellDecision] = field(default_factory=list)
+    buys: List[BuyDecision] = field(default_factory=list)
+    completed: bool = False
+
+
+def evaluate_ladder(
+    ladder: Sequence[LadderStep],
+    holdings: Sequence[Holding],
+    current_price: Decimal,
+    amount_per_step: Decimal,
+    current_step: int,
+) -> Evaluation:
+    """Decide the sells, buys and completion of an N-split session at one price
+
+    Pure function of the session's ladder state: sells come first, the
+    session completes once nothing is left holding after its first buy, and
+    buys only consider steps shallower than the lowest step still held.
+    """
+    evaluation = Evaluation()
+
+    # Sell every holding whose target is reached
+    remaining = []
+    for holding in holdings:
+        if current_price >= holding.sell_target_price:
+            evaluation.sells.append(SellDecision(holding=holding, price=current_price))
+        else:
+            remaining.append(holding)
+
+    # All positions sold, complete the session
+    if not remaining and current_step > 0:
+        evaluation.completed = True
+        return evaluation
+
+    held_steps = {holding.step_number for holding in remaining}
+    lowest_held_step = min(held_steps, default=None)
+
+    # Every step up to the deepest one priced at or above current price is triggered
+    for rung in ladder[:deepest_triggered_step(ladder, current_price)]:
+        if rung.step in held_steps:
+            continue  # Already have position at this step
+        if lowest_held_step is not None and lowest_held_step < rung.step:
+            continue  # Can't buy higher step while lower steps are holding
+
+        quantity = int(amount_per_step / rung.buy_price)
+        if quantity <= 0:
+            continue
+
+        evaluation.buys.append(BuyDecision(
+            step=rung.step,
+            price=rung.buy_price,
+            quantity=quantity,
+            sell_target_price=rung.sell_target_price,
+        ))
+
+    return evaluation
+
+
+def next_trigger_prices(
+    ladder: Sequence[LadderStep],
+    holdings: Sequence[Holding],
+    amount_per_step: Decimal,
+) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+    """Price levels at which evaluate_ladder would act, as (buy_at_or_below, sell_at_or_above)
+
+    Any price strictly between the two levels leaves the session unchanged.
+    """
+    sell_at_or_above = min((holding.sell_target_price for holding in holdings), default=None)
+
+    lowest_held_step = min((holding.step_number for holding in holdings), default=None)
+    buy_at_or_below = None
+    for rung in ladder:
+        if lowest_held_step is not None and rung.step >= lowest_held_step:
+            break
+        if int(amount_per_step / rung.buy_price) > 0:
+            buy_at_or_below = rung.buy_price
+            break
+
+    return buy_at_or_below, sell_at_or_above
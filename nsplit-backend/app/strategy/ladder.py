@@ -0,0 +1,72 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+PRICE_QUANTUM = Decimal('0.01')  # matches Numeric(12, 2) price columns
+
+
+@dataclass(frozen=True)
+class LadderStep:
+    """Buy price and sell target of one step in a session's price ladder"""
+
+    step: int
+    buy_price: Decimal
+    sell_target_price: Decimal
+
+
+def build_price_ladder(
+    first_buy_price: Decimal,
+    max_steps: int,
+    buy_trigger_pct: Decimal,
+    sell_trigger_pct: Decimal,
+) -> List[LadderStep]:
+    """Compute the buy/sell price of every step once first_buy_price is fixed"""
+    buy_trigger_ratio = Decimal('1') - (Decimal(buy_trigger_pct) / Decimal('100'))
+    sell_trigger_ratio = Decimal('1') + (Decimal(sell_trigger_pct) / Decimal('100'))
+
+    ladder = []
+    buy_price = Decimal(first_buy_price)
+    for step in range(1, max_steps + 1):
+        step_buy_price = buy_price.quantize(PRICE_QUANTUM)
+        ladder.append(LadderStep(
+            step=step,
+            buy_price=step_buy_price,
+            sell_target_price=(step_buy_price * sell_trigger_ratio).quantize(PRICE_QUANTUM),
+        ))
+        buy_price *= buy_trigger_ratio
+
+    return ladder
+
+
+def deepest_triggered_step(ladder: Sequence[LadderStep], current_price: Decimal) -> int:
+    """Return the deepest step whose buy price is at or above current_price (0 if none)
+
+    Buy prices strictly decrease with the step number, so this is a binary
+    search over the ladder.
+    """
+    return bisect_right(ladder, -current_price, key=lambda rung: -rung.buy_price)
+
+
+def ladder_to_json(ladder: List[LadderStep]) -> List[Dict[str, Any]]:
+    """Serialize a ladder for the sessions.price_ladder JSON column"""
+    return [
+        {
+            "step": rung.step,
+            "buy_price": str(rung.buy_price),
+            "sell_target_price": str(rung.sell_target_price),
+        }
+        for rung in ladder
+    ]
+
+
+def ladder_from_json(data: Optional[List[Dict[str, Any]]]) -> List[LadderStep]:
+    """Deserialize a ladder stored in the sessions.price_ladder JSON column"""
+    return [
+        LadderStep(
+            step=int(item["step"]),
+            buy_price=Decimal(item["buy_price"]),
+            sell_target_price=Decimal(item["sell_target_price"]),
+        )
+        for item in data or []
+    ]
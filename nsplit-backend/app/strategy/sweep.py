@@ -0,0 +1,261 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from multiprocessing import get_context, shared_memory
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.strategy.backtest import (
+    BacktestResult,
+    StrategyParams,
+    load_csv_prices,
+    load_parquet_prices,
+    load_simulator_prices,
+    run_backtest,
+)
+
+# Same bounds as SessionBase
+DEFAULT_MAX_STEPS = list(range(1, 11))
+DEFAULT_TRIGGER_PCTS = [Decimal(pct) for pct in (1, 2, 3, 5, 7, 10, 15, 20)]
+
+RANK_KEYS = ("total_profit", "return_on_drawdown", "capital_utilization")
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """Metrics of one parameter set, small enough to ship back from a worker process"""
+
+    params: StrategyParams
+    completed: bool
+    buys: int
+    sells: int
+    realized_profit: Decimal
+    unrealized_profit: Decimal
+    total_profit: Decimal
+    max_drawdown: Decimal
+    max_capital_deployed: Decimal
+    capital_utilization: float
+
+    @classmethod
+    def from_backtest(cls, result: BacktestResult) -> "SweepResult":
+        return cls(
+            params=result.params,
+            completed=result.completed,
+            buys=sum(1 for event in result.events if event.event_type == "buy"),
+            sells=sum(1 for event in result.events if event.event_type == "sell"),
+            realized_profit=result.realized_profit,
+            unrealized_profit=result.unrealized_profit,
+            total_profit=result.total_profit,
+            max_drawdown=result.max_drawdown,
+            max_capital_deployed=result.max_capital_deployed,
+            capital_utilization=result.capital_utilization,
+        )
+
+    @property
+    def return_on_drawdown(self) -> float:
+        if self.max_drawdown <= 0:
+            return float(self.total_profit) if self.total_profit <= 0 else float("inf")
+        return float(self.total_profit / self.max_drawdown)
+
+    def to_row(self) -> dict:
+        return {
+            "amount_per_step": str(self.params.amount_per_step),
+            "max_steps": self.params.max_steps,
+            "sell_trigger_pct": str(self.params.sell_trigger_pct),
+            "buy_trigger_pct": str(self.params.buy_trigger_pct),
+            "total_profit": str(self.total_profit),
+            "max_drawdown": str(self.max_drawdown),
+            "capital_utilization": round(self.capital_utilization, 4),
+            "completed": self.completed,
+            "buys": self.buys,
+            "sells": self.sells,
+        }
+
+
+def grid_candidates(
+    amount_per_step: Sequence[Decimal],
+    max_steps: Sequence[int] = DEFAULT_MAX_STEPS,
+    sell_trigger_pct: Sequence[Decimal] = DEFAULT_TRIGGER_PCTS,
+    buy_trigger_pct: Sequence[Decimal] = DEFAULT_TRIGGER_PCTS,
+    initial_buy_price: Optional[Decimal] = None,
+) -> List[StrategyParams]:
+    """Every combination of the given parameter values"""
+    return [
+        StrategyParams(
+            amount_per_step=amount,
+            max_steps=steps,
+            sell_trigger_pct=sell_pct,
+            buy_trigger_pct=buy_pct,
+            initial_buy_price=initial_buy_price,
+        )
+        for amount, steps, sell_pct, buy_pct in itertools.product(
+            amount_per_step, max_steps, sell_trigger_pct, buy_trigger_pct
+        )
+    ]
+
+
+def random_candidates(
+    count: int,
+    amount_per_step: Sequence[Decimal],
+    max_steps: Tuple[int, int] = (1, 10),
+    sell_trigger_pct: Tuple[Decimal, Decimal] = (Decimal('1'), Decimal('20')),
+    buy_trigger_pct: Tuple[Decimal, Decimal] = (Decimal('1'), Decimal('20')),
+    initial_buy_price: Optional[Decimal] = None,
+    seed: Optional[int] = None,
+) -> List[StrategyParams]:
+    """Up to count distinct parameter sets drawn uniformly from the given ranges
+
+    Trigger percentages are drawn on a 0.1% grid.
+    """
+    rng = random.Random(seed)
+
+    def draw_pct(bounds: Tuple[Decimal, Decimal]) -> Decimal:
+        low, high = (int(bound * 10) for bound in bounds)
+        return Decimal(rng.randint(low, high)) / 10
+
+    candidates = {}
+    for _ in range(count * 10):  # bounded retries when the space is small
+        if len(candidates) >= count:
+            break
+        params = StrategyParams(
+            amount_per_step=rng.choice(list(amount_per_step)),
+            max_steps=rng.randint(*max_steps),
+            sell_trigger_pct=draw_pct(sell_trigger_pct),
+            buy_trigger_pct=draw_pct(buy_trigger_pct),
+            initial_buy_price=initial_buy_price,
+        )
+        candidates.setdefault(params, params)
+    return list(candidates)
+
+
+def rank_results(results: Iterable[SweepResult], rank_by: str = "total_profit") -> List[SweepResult]:
+    """Best first; ties go to the smaller drawdown"""
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f"rank_by must be one of {', '.join(RANK_KEYS)}")
+    return sorted(results, key=lambda result: (-getattr(result, rank_by), result.max_drawdown))
+
+
+# Worker process state: the price series, mapped from the parent's shared memory
+_shared_block: Optional[shared_memory.SharedMemory] = None
+_shared_prices: Optional[np.ndarray] = None
+
+
+def _attach_prices(name: str, length: int):
+    global _shared_block, _shared_prices
+    _shared_block = shared_memory.SharedMemory(name=name)
+    _shared_prices = np.ndarray((length,), dtype=np.float64, buffer=_shared_block.buf)
+
+
+def _run_shared(params: StrategyParams) -> SweepResult:
+    return SweepResult.from_backtest(run_backtest(params, _shared_prices))
+
+
+def run_sweep(
+    prices: np.ndarray,
+    candidates: Sequence[StrategyParams],
+    workers: Optional[int] = None,
+    rank_by: str = "total_profit",
+) -> List[SweepResult]:
+    """Backtest every candidate against one price series and rank the results
+
+    Candidates fan out over a process pool. The series is copied once into
+    shared memory and mapped by every worker, so each task only ships a
+    StrategyParams in and a SweepResult back.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    workers = min(workers or os.cpu_count() or 1, len(candidates))
+
+    if workers <= 1 or prices.size == 0:
+        return rank_results(
+            (SweepResult.from_backtest(run_backtest(params, prices)) for params in candidates),
+            rank_by,
+        )
+
+    block = shared_memory.SharedMemory(create=True, size=prices.nbytes)
+    try:
+        np.ndarray(prices.shape, dtype=np.float64, buffer=block.buf)[:] = prices
+
+        # spawn: forking a process that runs scheduler/event loop threads is unsafe
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_attach_prices,
+            initargs=(block.name, len(prices)),
+        ) as executor:
+            chunksize = max(1, len(candidates) // (workers * 4))
+            results = list(executor.map(_run_shared, candidates, chunksize=chunksize))
+    finally:
+        block.close()
+        block.unlink()
+
+    return rank_results(results, rank_by)
+
+
+def _decimal_list(value: str) -> List[Decimal]:
+    return [Decimal(item) for item in value.split(",") if item.strip()]
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep N-split parameters over a price series")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV file with a header row")
+    source.add_argument("--parquet", help="Parquet file")
+    source.add_argument("--stock-code", help="Replay the simulator's SimPriceHistory for this stock")
+    parser.add_argument("--column", default="price", help="Price column for CSV/Parquet input")
+    parser.add_argument("--limit", type=int, default=100000, help="History rows to load from the simulator")
+    parser.add_argument("--amount-per-step", type=_decimal_list, required=True, help="Comma-separated values")
+    parser.add_argument("--max-steps", type=_int_list, default=DEFAULT_MAX_STEPS)
+    parser.add_argument("--sell-trigger-pct", type=_decimal_list, default=DEFAULT_TRIGGER_PCTS)
+    parser.add_argument("--buy-trigger-pct", type=_decimal_list, default=DEFAULT_TRIGGER_PCTS)
+    parser.add_argument("--initial-buy-price", type=Decimal, default=None)
+    parser.add_argument("--random", type=int, default=None, metavar="N",
+                        help="Sample N parameter sets within the given ranges instead of the full grid")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for --random")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--rank-by", choices=RANK_KEYS, default="total_profit")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.csv:
+        prices = np.concatenate(list(load_csv_prices(args.csv, args.column)))
+    elif args.parquet:
+        prices = np.concatenate(list(load_parquet_prices(args.parquet, args.column)))
+    else:
+        prices = asyncio.run(load_simulator_prices(args.stock_code, args.limit))
+
+    if args.random:
+        candidates = random_candidates(
+            args.random,
+            args.amount_per_step,
+            max_steps=(min(args.max_steps), max(args.max_steps)),
+            sell_trigger_pct=(min(args.sell_trigger_pct), max(args.sell_trigger_pct)),
+            buy_trigger_pct=(min(args.buy_trigger_pct), max(args.buy_trigger_pct)),
+            initial_buy_price=args.initial_buy_price,
+            seed=args.seed,
+        )
+    else:
+        candidates = grid_candidates(
+            args.amount_per_step,
+            args.max_steps,
+            args.sell_trigger_pct,
+            args.buy_trigger_pct,
+            args.initial_buy_price,
+        )
+
+    results = run_sweep(prices, candidates, workers=args.workers, rank_by=args.rank_by)
+    print(json.dumps([result.to_row() for result in results[:args.top]], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,237 +1,697 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from sqlalchemy.orm import Session
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
 from decimal import Decimal
 from datetime import datetime
+from typing import Dict, List, Optional, Set
+from uuid import UUID
 import asyncio
+import signal
+import time
+import uuid
 import logging
 
-from app.database import SessionLocal
+from app.config import settings
+from app.database import SessionLocal, close_db, init_db
 from app.models.session import Session as SessionModel
 from app.models.position import Position
 from app.models.session_event import SessionEvent
+from app.services.event_broadcaster import event_broadcaster
+from app.services.price_cache import price_cache
 from app.services.simulator_client import simulator_client
+from app.strategy.batch import LadderBook
+from app.strategy.evaluator import BuyDecision, SellDecision, evaluate_ladder
+from app.strategy.ladder import LadderStep, build_price_ladder, ladder_from_json, ladder_to_json
+from app.workers.event_journal import event_journal, pending_events, stage_event
+from app.workers.session_leases import WORKER_ID, fence_lease, holds_lease, shutdown_leases, sync_leases
+from app.workers.session_stats import ensure_session_stats, record_buy, record_sell
+from app.workers.tick_scheduler import TickScheduler
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-scheduler = BackgroundScheduler()
+# Runs on the application's event loop, so every tick shares one long-lived loop
+scheduler = AsyncIOScheduler()
+
+# Price stream subscriber task (WORKER_PRICE_MODE=stream)
+_subscriber_task: Optional[asyncio.Task] = None
+
+# Bounds concurrent session evaluation across ticks and price pushes
+_semaphore: Optional[asyncio.Semaphore] = None
+
+# Sessions currently being evaluated, so a tick and a price push never overlap
+_in_flight: Set[UUID] = set()
+
+# Cached ladder state per ticker; a session's row is reloaded after each evaluation
+_books: Dict[str, LadderBook] = {}
+
+# Running sessions leased to this worker, refreshed every WORKER_INTERVAL_SECONDS
+_sessions_by_code: Dict[str, List[UUID]] = {}
+
+# Polls tickers near a trigger every WORKER_MIN_INTERVAL_SECONDS, far ones every WORKER_MAX_INTERVAL_SECONDS
+tick_scheduler = TickScheduler(
+    buckets=(
+        settings.WORKER_MIN_INTERVAL_SECONDS,
+        settings.WORKER_INTERVAL_SECONDS,
+        settings.WORKER_MAX_INTERVAL_SECONDS,
+    ),
+    default_interval=settings.WORKER_INTERVAL_SECONDS,
+)
 
 
 def start_worker():
-    """Start the auto trading worker"""
+    """Start the auto trading worker
+
+    Several workers (API processes or standalone ones) can run against the
+    same database: each only trades the sessions it holds a lease on.
+    """
+    global _subscriber_task
+
+    scheduler.add_job(
+        refresh_leases,
+        'interval',
+        seconds=max(1, settings.WORKER_LEASE_SECONDS // 3),
+        id='session_leases',
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+        next_run_time=datetime.now(),
+    )
+    scheduler.add_job(
+        refresh_sessions,
+        'interval',
+        seconds=settings.WORKER_INTERVAL_SECONDS,
+        id='running_sessions',
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+    )
     scheduler.add_job(
         run_auto_trading,
         'interval',
-        seconds=5,
+        seconds=settings.WORKER_MIN_INTERVAL_SECONDS,
         id='auto_trading_worker',
         replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+    )
+    scheduler.add_job(
+        flush_event_journal,
+        'interval',
+        seconds=settings.EVENT_JOURNAL_FLUSH_SECONDS,
+        id='event_journal',
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
     )
     scheduler.start()
-    logger.info("Auto trading worker started")
+
+    if settings.WORKER_PRICE_MODE == "stream":
+        _subscriber_task = asyncio.get_running_loop().create_task(run_price_subscriber())
+
+    logger.info(f"Auto trading worker {WORKER_ID} started (price mode: {settings.WORKER_PRICE_MODE})")
 
 
-def stop_worker():
-    """Stop the auto trading worker"""
+async def stop_worker():
+    """Stop the auto trading worker and hand its sessions back"""
+    global _subscriber_task
+
     scheduler.shutdown()
-    logger.info("Auto trading worker stopped")
+    if _subscriber_task is not None:
+        _subscriber_task.cancel()
+        _subscriber_task = None
+
+    await flush_event_journal()
+    await flush_price_cache()
+    async with SessionLocal() as db:
+        try:
+            await shutdown_leases(db)
+        except Exception as e:
+            logger.error(f"Failed to release session leases: {str(e)}")
+            await db.rollback()
+    logger.info(f"Auto trading worker {WORKER_ID} stopped")
+
+
+async def refresh_leases():
+    """Heartbeat and rebalance this worker's session leases, then pick up the result"""
+    async with SessionLocal() as db:
+        try:
+            owned = await sync_leases(db, busy=set(_in_flight))
+            logger.debug(f"Worker {WORKER_ID} holds {owned} session leases")
+        except Exception as e:
+            logger.error(f"Failed to sync session leases: {str(e)}")
+            await db.rollback()
+
+    await refresh_sessions()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.WORKER_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def load_running_sessions(stock_codes: Optional[List[str]] = None) -> Dict[str, List[UUID]]:
+    """Load the ids of running sessions leased to this worker, grouped by stock code"""
+    query = select(SessionModel.id, SessionModel.stock_code).where(
+        SessionModel.status == "running",
+        SessionModel.lease_owner == WORKER_ID,
+    )
+    if stock_codes is not None:
+        query = query.where(SessionModel.stock_code.in_(stock_codes))
+
+    async with SessionLocal() as db:
+        sessions_by_code: Dict[str, List[UUID]] = defaultdict(list)
+        for row in await db.execute(query):
+            sessions_by_code[row.stock_code].append(row.id)
+        return sessions_by_code
+
 
+async def refresh_sessions():
+    """Reload which running sessions this worker trades, prune stale ladder state
+    and flush the price cache
+
+    Runs on the event loop (not APScheduler's thread pool) since it mutates
+    the ladder books that dispatch_sessions reads.
+    """
+    global _sessions_by_code
 
-def run_auto_trading():
-    """Main worker function that runs every 5 seconds"""
-    db = SessionLocal()
     try:
-        # Process running sessions
-        sessions = db.query(SessionModel).filter(SessionModel.status == "running").all()
+        sessions_by_code = await load_running_sessions()
+        await load_ladder_books(sessions_by_code, prune=True)
+        tick_scheduler.retain(sessions_by_code)
+
+        # Tickers that gained sessions are polled right away, whatever their bucket
+        tick_scheduler.wake(
+            stock_code for stock_code, session_ids in sessions_by_code.items()
+            if not set(session_ids) <= set(_sessions_by_code.get(stock_code, ()))
+        )
+        _sessions_by_code = sessions_by_code
+    except Exception as e:
+        logger.error(f"Failed to refresh running sessions: {str(e)}")
+
+    await flush_price_cache()
+    price_cache.retain(_sessions_by_code)
+
+
+async def flush_price_cache():
+    """Share the last fetched prices with API processes that run without a worker"""
+    async with SessionLocal() as db:
+        try:
+            await price_cache.flush(db)
+        except Exception as e:
+            logger.error(f"Failed to write cached prices: {str(e)}")
+            await db.rollback()
+
+
+async def flush_event_journal():
+    """Write the trade events queued since the last flush"""
+    if not len(event_journal):
+        return
+
+    async with SessionLocal() as db:
+        try:
+            written = await event_journal.flush(db)
+            logger.debug(f"Wrote {written} session events")
+        except Exception as e:
+            logger.error(f"Failed to write session events, {len(event_journal)} queued: {str(e)}")
+            await db.rollback()
+
+
+async def load_ladder_books(sessions_by_code: Dict[str, List[UUID]], prune: bool = False) -> Dict[str, LadderBook]:
+    """Sync the cached ladder books of the given tickers with their running sessions
+
+    Sessions that stopped running are dropped; sessions not yet cached are
+    loaded with one query for the sessions and one for their holdings. With
+    prune, books of tickers not in sessions_by_code are dropped too.
+    """
+    missing: List[UUID] = []
+    for stock_code, session_ids in sessions_by_code.items():
+        book = _books.setdefault(stock_code, LadderBook())
+        book.retain(session_ids)
+        missing.extend(session_id for session_id in session_ids if session_id not in book)
+
+    if prune:
+        for stock_code in list(_books):
+            if stock_code not in sessions_by_code:
+                del _books[stock_code]
+
+    if not missing:
+        return _books
+
+    async with SessionLocal() as db:
+        sessions = (await db.scalars(select(SessionModel).where(SessionModel.id.in_(missing)))).all()
+        holdings_by_session: Dict[UUID, List[Position]] = defaultdict(list)
+        for position in await db.scalars(select(Position).where(
+            Position.session_id.in_(missing),
+            Position.status == "holding",
+        )):
+            holdings_by_session[position.session_id].append(position)
+
+    for session in sessions:
+        book = _books.get(session.stock_code)
+        if book is None:
+            continue  # A concurrent refresh pruned the ticker while the query ran
+
+        ladder = None
+        if session.first_buy_price is not None and session.price_ladder is not None:
+            ladder = ladder_from_json(session.price_ladder)
+        book.upsert(
+            session.id,
+            ladder,
+            holdings_by_session[session.id],
+            session.amount_per_step,
+            session.current_step,
+        )
+    return _books
+
+
+async def dispatch_sessions(sessions_by_code: Dict[str, List[UUID]], prices: Dict[str, Decimal]):
+    """Evaluate the sessions each ticker's price triggers, concurrently
+
+    A vectorized pass over each ticker's ladder book picks out the sessions
+    that would trade at the current price; only those get a full evaluation.
+    Afterwards each ticker is rescheduled by its distance to the nearest
+    remaining trigger.
+    """
+    semaphore = _get_semaphore()
+    price_cache.update(prices)
+    books = await load_ladder_books(sessions_by_code)
+    now = time.monotonic()
 
-        for session in sessions:
+    async def run_one(session_id: UUID, current_price: Decimal, book: LadderBook):
+        async with semaphore:
             try:
-                asyncio.run(process_session(db, session))
-            except Exception as e:
-                logger.error(f"Error processing session {session.id}: {str(e)}")
-                # Pause session on error
-                session.status = "paused"
-                event = SessionEvent(
-                    session_id=session.id,
-                    event_type="error",
-                    message=f"Error: {str(e)}",
-                )
-                db.add(event)
-                db.commit()
+                await process_session(session_id, current_price)
+            finally:
+                book.remove(session_id)  # reload its new state next time
+
+    tasks = []
+    for stock_code in sessions_by_code:
+        current_price = prices.get(stock_code)
+        if current_price is None:
+            logger.warning(f"No price returned for {stock_code}")
+            tick_scheduler.postpone([stock_code], now)
+            continue
+        book = books.get(stock_code)
+        if book is None:
+            continue  # Pruned by a concurrent refresh, no longer this worker's ticker
+        tick_scheduler.observe(stock_code, float(current_price), now)
+        tasks.extend(
+            run_one(session_id, current_price, book)
+            for session_id in book.triggered(float(current_price))
+        )
+
+    await asyncio.gather(*tasks)
+
+    # Reload the sessions that were just evaluated before measuring distances
+    if tasks:
+        books = await load_ladder_books(sessions_by_code)
+    now = time.monotonic()
+    for stock_code in sessions_by_code:
+        current_price = prices.get(stock_code)
+        book = books.get(stock_code)
+        if current_price is not None and book is not None:
+            tick_scheduler.schedule(stock_code, book.nearest_trigger_distance(float(current_price)), now)
+
 
+async def run_auto_trading():
+    """Main worker function that runs every fast tick
+
+    Only tickers the tick scheduler marks as due are polled. Prices are
+    fetched once per due stock code and fanned out to every session on that
+    ticker. Sessions are processed concurrently, bounded by
+    WORKER_MAX_CONCURRENCY, and each gets its own DB unit of work.
+    """
+    due = tick_scheduler.due(_sessions_by_code, time.monotonic())
+    if not due:
+        return
+
+    try:
+        prices = await simulator_client.get_current_prices(due)
     except Exception as e:
-        logger.error(f"Error in auto trading worker: {str(e)}")
+        logger.error(f"Failed to fetch prices, skipping tick: {str(e)}")
+        tick_scheduler.postpone(due, time.monotonic())
+        return
+
+    await dispatch_sessions({stock_code: _sessions_by_code[stock_code] for stock_code in due}, prices)
+
+
+async def run_price_subscriber():
+    """Evaluate sessions as soon as the simulator pushes a new price for their ticker
+
+    The polling tick keeps running alongside as a reconciliation pass, e.g.
+    for ticks missed while reconnecting.
+    """
+    backoff = 1
+    while True:
+        try:
+            async for prices in simulator_client.stream_prices():
+                backoff = 1
+                sessions_by_code = {
+                    stock_code: _sessions_by_code[stock_code]
+                    for stock_code in prices
+                    if stock_code in _sessions_by_code
+                }
+                if sessions_by_code:
+                    await dispatch_sessions(sessions_by_code, prices)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Price stream disconnected: {str(e)}")
+
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30)
+
+
+async def process_session(session_id: UUID, current_price: Decimal):
+    """Process a single session for buy/sell opportunities in its own unit of work"""
+    if session_id in _in_flight:
+        return
+    _in_flight.add(session_id)
+
+    try:
+        async with SessionLocal() as db:
+            await evaluate_session(db, session_id, current_price)
     finally:
-        db.close()
+        _in_flight.discard(session_id)
 
 
-async def process_session(db: Session, session: SessionModel):
-    """Process a single session for buy/sell opportunities"""
+async def evaluate_session(db: AsyncSession, session_id: UUID, current_price: Decimal):
+    """Evaluate one session at the current price and commit its trades, pausing it on failure"""
     try:
-        # Get current price
-        current_price = await simulator_client.get_current_price(session.stock_code)
+        session = await db.get(SessionModel, session_id)
+        if session is None or session.status != "running" or not holds_lease(session):
+            return
+
+        # Load the session's ladder state once; every step is evaluated in memory
+        holdings = await load_holding_positions(db, session)
+        await ensure_session_stats(db, session)
+        ladder = ensure_price_ladder(session, current_price)
+
+        evaluation = evaluate_ladder(
+            ladder,
+            holdings,
+            current_price,
+            session.amount_per_step,
+            session.current_step,
+        )
 
-        # Check for sell opportunities first
-        await check_sell_opportunities(db, session, current_price)
+        # Sell first, then either complete the session or buy; a rejected
+        # order pauses the session, but the orders that filled are recorded
+        rejected = await execute_sells(db, session, evaluation.sells)
+
+        if not rejected:
+            if evaluation.completed:
+                complete_session(db, session)
+            else:
+                rejected = await execute_buys(db, session, evaluation.buys)
+
+        paused = None
+        if rejected:
+            paused = pause_on_rejected_orders(db, session, rejected)
+
+        # Another worker may have taken the session while the orders were out
+        if (db.new or db.dirty) and not await fence_lease(db, session.id):
+            logger.warning(f"Lost the lease on session {session_id} before committing, rolling back its trades")
+            pending_events(db)
+            await db.rollback()
+            return
+
+        events = pending_events(db)
+        await db.commit()
+        if events:
+            event_journal.append(session, events)
+        if paused is not None:
+            event_broadcaster.publish_session(session, [paused])
 
-        # Check for buy opportunities
-        await check_buy_opportunities(db, session, current_price)
+    except Exception as e:
+        logger.error(f"Error processing session {session_id}: {str(e)}")
+        pending_events(db)  # The trades they describe were rolled back
+        await db.rollback()
+        await pause_session_on_error(db, session_id, e)
 
-        db.commit()
 
+async def pause_session_on_error(db: AsyncSession, session_id: UUID, error: Exception):
+    """Pause a session and record the error that stopped it"""
+    try:
+        session = await db.get(SessionModel, session_id)
+        if session is None:
+            return
+        session.status = "paused"
+        event = SessionEvent(
+            session_id=session.id,
+            event_type="error",
+            message=f"Error: {str(error)}",
+        )
+        db.add(event)
+        await db.commit()
+        event_broadcaster.publish_session(session, [event])
     except Exception as e:
-        logger.error(f"Error processing session {session.id}: {str(e)}")
-        raise
+        logger.error(f"Failed to pause session {session_id}: {str(e)}")
+        await db.rollback()
 
 
-async def check_buy_opportunities(db: Session, session: SessionModel, current_price: Decimal):
-    """Check if we should buy at any step"""
-    # Determine first buy price
-    if session.first_buy_price is None:
-        first_buy_price = session.initial_buy_price or current_price
-        session.first_buy_price = first_buy_price
-    else:
-        first_buy_price = session.first_buy_price
-
-    # Calculate buy prices for all steps
-    buy_trigger_ratio = Decimal('1') - (session.buy_trigger_pct / Decimal('100'))
-
-    for step in range(1, session.max_steps + 1):
-        # Calculate buy price for this step
-        step_buy_price = first_buy_price * (buy_trigger_ratio ** (step - 1))
-
-        # Check if current price is at or below buy price
-        if current_price <= step_buy_price:
-            # Check if we already have a holding position at this step
-            existing_position = db.query(Position).filter(
-                Position.session_id == session.id,
-                Position.step_number == step,
-                Position.status == "holding"
-            ).first()
-
-            if existing_position:
-                continue  # Already have position at this step
-
-            # Check if lower steps have holding positions
-            lower_holding = db.query(Position).filter(
-                Position.session_id == session.id,
-                Position.step_number < step,
-                Position.status == "holding"
-            ).first()
-
-            if lower_holding:
-                continue  # Can't buy higher step while lower steps are holding
-
-            # Calculate quantity
-            quantity = int(session.amount_per_step / step_buy_price)
-
-            if quantity <= 0:
-                logger.warning(f"Quantity is 0 for session {session.id} step {step}")
-                continue
-
-            # Place buy order
-            try:
-                order_result = await simulator_client.place_buy_order(
-                    user_id=str(session.user_id),
-                    stock_code=session.stock_code,
-                    price=step_buy_price,
-                    quantity=quantity,
-                )
-
-                # Calculate sell target price
-                sell_target_price = step_buy_price * (Decimal('1') + session.sell_trigger_pct / Decimal('100'))
-
-                # Create position
-                position = Position(
-                    session_id=session.id,
-                    step_number=step,
-                    buy_price=step_buy_price,
-                    quantity=quantity,
-                    buy_time=datetime.utcnow(),
-                    sell_target_price=sell_target_price,
-                    status="holding",
-                )
-                db.add(position)
-
-                # Update session current step
-                if step > session.current_step:
-                    session.current_step = step
-
-                # Log event
-                event = SessionEvent(
-                    session_id=session.id,
-                    event_type="buy",
-                    position_id=position.id,
-                    price=step_buy_price,
-                    quantity=quantity,
-                    message=f"Bought {quantity} shares at step {step} for {step_buy_price}",
-                )
-                db.add(event)
-
-                logger.info(f"Buy order executed: session={session.id}, step={step}, price={step_buy_price}, qty={quantity}")
-
-            except Exception as e:
-                logger.error(f"Failed to place buy order: {str(e)}")
-                raise
-
-
-async def check_sell_opportunities(db: Session, session: SessionModel, current_price: Decimal):
-    """Check if we should sell any holding positions"""
-    holding_positions = db.query(Position).filter(
+async def load_holding_positions(db: AsyncSession, session: SessionModel) -> List[Position]:
+    """Load all holding positions of a session in a single query"""
+    return (await db.scalars(select(Position).where(
         Position.session_id == session.id,
         Position.status == "holding"
-    ).all()
+    ))).all()
 
-    for position in holding_positions:
-        # Check if current price meets sell target
-        if current_price >= position.sell_target_price:
-            try:
-                # Place sell order
-                order_result = await simulator_client.place_sell_order(
-                    user_id=str(session.user_id),
-                    stock_code=session.stock_code,
-                    price=current_price,
-                    quantity=position.quantity,
-                )
-
-                # Update position
-                position.sell_price = current_price
-                position.sell_time = datetime.utcnow()
-                position.realized_profit = (current_price - position.buy_price) * position.quantity
-                position.status = "sold"
-
-                # Log event
-                event = SessionEvent(
-                    session_id=session.id,
-                    event_type="sell",
-                    position_id=position.id,
-                    price=current_price,
-                    quantity=position.quantity,
-                    message=f"Sold {position.quantity} shares at step {position.step_number} for {current_price}, profit: {position.realized_profit}",
-                )
-                db.add(event)
-
-                logger.info(f"Sell order executed: session={session.id}, step={position.step_number}, price={current_price}, profit={position.realized_profit}")
-
-            except Exception as e:
-                logger.error(f"Failed to place sell order: {str(e)}")
-                raise
-
-    # Check if all positions are sold
-    remaining_positions = db.query(Position).filter(
-        Position.session_id == session.id,
-        Position.status == "holding"
-    ).count()
 
-    if remaining_positions == 0 and session.current_step > 0:
-        # All positions sold, complete the session
-        session.status = "completed"
-        session.completed_at = datetime.utcnow()
+def ensure_price_ladder(session: SessionModel, current_price: Decimal) -> List[LadderStep]:
+    """Fix the session's first buy price and price ladder on its first evaluation"""
+    if session.first_buy_price is None:
+        session.first_buy_price = session.initial_buy_price or current_price
+        session.price_ladder = None
+
+    if session.price_ladder is None:
+        session.price_ladder = ladder_to_json(build_price_ladder(
+            session.first_buy_price,
+            session.max_steps,
+            session.buy_trigger_pct,
+            session.sell_trigger_pct,
+        ))
+
+    return ladder_from_json(session.price_ladder)
 
+
+def rejection(result: dict) -> Optional[str]:
+    """Why the simulator rejected an order, None if it filled"""
+    if result["status"] != "rejected":
+        return None
+    return f"Order rejected ({result['status_code']}): {result['error']}"
+
+
+def fill_price(result: dict) -> Decimal:
+    """Price the simulator filled an order at
+
+    A replayed order comes back with its original fill, which may have been
+    at an earlier tick's price, so positions are always recorded at this
+    price rather than the one sent.
+    """
+    return Decimal(str(result["order"]["price"]))
+
+
+def pause_on_rejected_orders(db: AsyncSession, session: SessionModel, rejected: List[str]) -> SessionEvent:
+    """Pause a session some of whose orders were rejected, keeping the ones that filled
+
+    The error event is written with the pause itself, not journaled, so a
+    paused session always has its reason recorded.
+    """
+    session.status = "paused"
+
+    event = SessionEvent(
+        session_id=session.id,
+        event_type="error",
+        message="; ".join(rejected),
+    )
+    db.add(event)
+
+    logger.error(f"Session {session.id} paused, orders rejected: {event.message}")
+    return event
+
+
+async def buy_idempotency_keys(db: AsyncSession, session: SessionModel, buys: List[BuyDecision]) -> List[str]:
+    """Key each buy by its session, step and how many times the step was bought before
+
+    The keys only depend on committed positions, so a retry after a fill
+    whose local commit failed (or after a worker restart) sends the same
+    key and the simulator replays the fill instead of buying the step again.
+    A step's price and quantity are fixed by the ladder, so the replayed
+    order always matches.
+    """
+    bought = dict((await db.execute(
+        select(Position.step_number, func.count(Position.id))
+        .where(Position.session_id == session.id, Position.step_number.in_([buy.step for buy in buys]))
+        .group_by(Position.step_number)
+    )).all())
+    return [f"buy:{session.id}:{buy.step}:{bought.get(buy.step, 0)}" for buy in buys]
+
+
+async def execute_buys(db: AsyncSession, session: SessionModel, buys: List[BuyDecision]) -> List[str]:
+    """Place the buy orders decided by the strategy and open positions for the filled ones
+
+    Returns why each rejected order was rejected.
+    """
+    if not buys:
+        return []
+
+    position_ids = [uuid.uuid4() for _ in buys]
+    idempotency_keys = await buy_idempotency_keys(db, session, buys)
+    try:
+        results = await simulator_client.submit_orders([
+            simulator_client.build_order(
+                "buy",
+                user_id=str(session.user_id),
+                stock_code=session.stock_code,
+                price=buy.price,
+                quantity=buy.quantity,
+                idempotency_key=idempotency_key,
+            )
+            for buy, idempotency_key in zip(buys, idempotency_keys)
+        ])
+    except Exception as e:
+        logger.error(f"Failed to place buy order: {str(e)}")
+        raise
+
+    rejected = []
+    for buy, position_id, result in zip(buys, position_ids, results):
+        reason = rejection(result)
+        if reason is not None:
+            rejected.append(f"Buy at step {buy.step}: {reason}")
+            continue
+
+        price = fill_price(result)
+
+        # Create position
+        position = Position(
+            id=position_id,
+            session_id=session.id,
+            step_number=buy.step,
+            buy_price=price,
+            quantity=buy.quantity,
+            buy_time=datetime.utcnow(),
+            sell_target_price=buy.sell_target_price,
+            status="holding",
+        )
+        db.add(position)
+
+        # Update session current step
+        if buy.step > session.current_step:
+            session.current_step = buy.step
+        record_buy(session.stats, buy.step, price, buy.quantity, position.buy_time)
+
+        # Log event
         event = SessionEvent(
             session_id=session.id,
-            event_type="complete",
-            message="All positions sold, session completed",
+            event_type="buy",
+            position_id=position.id,
+            price=price,
+            quantity=buy.quantity,
+            message=f"Bought {buy.quantity} shares at step {buy.step} for {price}",
         )
-        db.add(event)
+        stage_event(db, event)
+
+        logger.info(f"Buy order executed: session={session.id}, step={buy.step}, price={price}, qty={buy.quantity}")
+
+    return rejected
+
+
+async def execute_sells(db: AsyncSession, session: SessionModel, sells: List[SellDecision]) -> List[str]:
+    """Place the sell orders decided by the strategy and close the positions that filled
+
+    Returns why each rejected order was rejected.
+    """
+    if not sells:
+        return []
+
+    try:
+        # The key makes a retry after a failed commit safe; it replays the original fill
+        results = await simulator_client.submit_orders([
+            simulator_client.build_order(
+                "sell",
+                user_id=str(session.user_id),
+                stock_code=session.stock_code,
+                price=sell.price,
+                quantity=sell.holding.quantity,
+                idempotency_key=f"sell:{sell.holding.id}",
+            )
+            for sell in sells
+        ])
+    except Exception as e:
+        logger.error(f"Failed to place sell order: {str(e)}")
+        raise
+
+    rejected = []
+    for sell, result in zip(sells, results):
+        position = sell.holding
+        reason = rejection(result)
+        if reason is not None:
+            rejected.append(f"Sell at step {position.step_number}: {reason}")
+            continue
+
+        current_price = fill_price(result)
+
+        # Update position
+        position.sell_price = current_price
+        position.sell_time = datetime.utcnow()
+        position.realized_profit = (current_price - position.buy_price) * position.quantity
+        position.status = "sold"
+        record_sell(session.stats, position, position.sell_time)
+
+        # Log event
+        event = SessionEvent(
+            session_id=session.id,
+            event_type="sell",
+            position_id=position.id,
+            price=current_price,
+            quantity=position.quantity,
+            message=f"Sold {position.quantity} shares at step {position.step_number} for {current_price}, profit: {position.realized_profit}",
+        )
+        stage_event(db, event)
+
+        logger.info(f"Sell order executed: session={session.id}, step={position.step_number}, price={current_price}, profit={position.realized_profit}")
+
+    return rejected
+
+
+def complete_session(db: AsyncSession, session: SessionModel):
+    """Complete a session once all of its positions are sold"""
+    session.status = "completed"
+    session.completed_at = datetime.utcnow()
+
+    event = SessionEvent(
+        session_id=session.id,
+        event_type="complete",
+        message="All positions sold, session completed",
+    )
+    stage_event(db, event)
+
+    logger.info(f"Session {session.id} completed")
+
+
+async def run_standalone():
+    """Run the worker on its own event loop until SIGINT/SIGTERM"""
+    await init_db()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    simulator_client.start()
+    start_worker()
+    try:
+        await stop.wait()
+    finally:
+        await stop_worker()
+        await simulator_client.close()
+        await close_db()
+
 
-        logger.info(f"Session {session.id} completed")
+if __name__ == "__main__":
+    asyncio.run(run_standalone())
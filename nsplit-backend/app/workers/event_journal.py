@@ -0,0 +1,116 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List
+import uuid
+
+from app.config import settings
+from app.models.session import Session as SessionModel
+from app.models.session_event import SessionEvent
+from app.services.event_broadcaster import event_broadcaster
+
+EVENT_COLUMNS = ("id", "session_id", "event_type", "position_id", "price", "quantity", "message")
+
+
+def stage_event(db: AsyncSession, event: SessionEvent) -> SessionEvent:
+    """Hold an event for the journal until the current unit of work commits
+
+    The event is not added to the session, so it stays out of the trading
+    transaction. Its id is fixed now; its timestamp when the journal writes it.
+    """
+    event.id = event.id or uuid.uuid4()
+    db.info.setdefault("staged_events", []).append(event)
+    return event
+
+
+def pending_events(db: AsyncSession) -> List[SessionEvent]:
+    """Take the events staged in the current unit of work, to journal once it commits"""
+    return db.info.pop("staged_events", [])
+
+
+@dataclass
+class JournalEntry:
+    """One session's events from one commit, with the session state to publish after them"""
+    user_id: Any
+    session_id: Any
+    status: str
+    current_step: int
+    rows: List[Dict[str, Any]]
+
+
+class EventJournal:
+    """Append-only buffer of committed session events, bulk-inserted by a background flush
+
+    The worker's trades are durable through their position and session rows;
+    the events describing them are appended here after the trade commits and
+    written in batches, one multi-row INSERT each. Events still buffered when
+    a process dies are lost, so only events that are derivable from other
+    rows or purely informational go through the journal.
+
+    Events are timestamped when their batch is written, not when they
+    happened, so a row never lands behind a timeline cursor a client already
+    holds, and they are streamed only once written, with those timestamps.
+    """
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+        self._pending: List[JournalEntry] = []
+
+    def __len__(self) -> int:
+        return sum(len(entry.rows) for entry in self._pending)
+
+    def append(self, session: SessionModel, events: Iterable[SessionEvent]):
+        """Queue a session's committed events for the next flush"""
+        self._pending.append(JournalEntry(
+            user_id=session.user_id,
+            session_id=session.id,
+            status=session.status,
+            current_step=session.current_step,
+            rows=[{column: getattr(event, column) for column in EVENT_COLUMNS} for event in events],
+        ))
+
+    def _next_batch(self) -> List[JournalEntry]:
+        """Take whole entries from the front of the queue, up to batch_size rows"""
+        count, rows = 0, 0
+        for entry in self._pending:
+            if count and rows + len(entry.rows) > self.batch_size:
+                break
+            count += 1
+            rows += len(entry.rows)
+        batch = self._pending[:count]
+        del self._pending[:count]
+        return batch
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Insert every queued event in batches, returning how many were written
+
+        A failed batch goes back to the front of the queue, keeping the
+        timeline's insert order, and is retried on the next flush. Each
+        entry is published to the session streams once its batch commits.
+        """
+        written = 0
+        while self._pending:
+            batch = self._next_batch()
+            rows = [row for entry in batch for row in entry.rows]
+            # One microsecond apart, keeping the insert order within the batch
+            written_at = datetime.utcnow()
+            for offset, row in enumerate(rows):
+                row["created_at"] = written_at + timedelta(microseconds=offset)
+            try:
+                await db.execute(insert(SessionEvent), rows)
+                await db.commit()
+            except Exception:
+                self._pending[:0] = batch
+                raise
+            written += len(rows)
+
+            for entry in batch:
+                event_broadcaster.publish_status(
+                    entry.user_id, entry.session_id, entry.status, entry.current_step, events=entry.rows
+                )
+        return written
+
+
+# Singleton instance
+event_journal = EventJournal(batch_size=settings.EVENT_JOURNAL_BATCH_SIZE)
@@ -0,0 +1,178 @@
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Collection, Optional
+import math
+import os
+import socket
+import uuid
+
+from app.config import settings
+from app.models.session import Session as SessionModel
+from app.models.worker import WorkerHeartbeat
+
+# Identifies this process in lease_owner; a fixed WORKER_ID lets a restarted worker keep its leases
+WORKER_ID = settings.WORKER_ID or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _lease_period() -> timedelta:
+    return timedelta(seconds=settings.WORKER_LEASE_SECONDS)
+
+
+def _claimable(now: datetime):
+    """Running sessions nobody holds a live lease on"""
+    return and_(
+        SessionModel.status == "running",
+        or_(SessionModel.lease_owner.is_(None), SessionModel.lease_expires_at < now),
+    )
+
+
+async def heartbeat(db: AsyncSession, worker_id: str, now: datetime):
+    """Mark this worker alive and forget workers silent for more than a lease period"""
+    worker = await db.get(WorkerHeartbeat, worker_id)
+    if worker is None:
+        db.add(WorkerHeartbeat(id=worker_id, heartbeat_at=now))
+    else:
+        worker.heartbeat_at = now
+
+    await db.execute(
+        delete(WorkerHeartbeat)
+        .where(WorkerHeartbeat.heartbeat_at < now - _lease_period())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def fair_share(db: AsyncSession, now: datetime) -> int:
+    """Sessions each live worker should own so that the running ones are spread evenly"""
+    running = await db.scalar(select(func.count(SessionModel.id)).where(SessionModel.status == "running"))
+    workers = await db.scalar(
+        select(func.count(WorkerHeartbeat.id)).where(WorkerHeartbeat.heartbeat_at >= now - _lease_period())
+    )
+    return math.ceil(running / max(workers, 1))
+
+
+async def renew_leases(db: AsyncSession, worker_id: str, now: datetime) -> int:
+    """Extend every lease this worker holds on a running session; returns how many"""
+    result = await db.execute(
+        update(SessionModel)
+        .where(SessionModel.lease_owner == worker_id, SessionModel.status == "running")
+        .values(lease_expires_at=now + _lease_period())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def claim_sessions(db: AsyncSession, worker_id: str, limit: int, now: datetime) -> int:
+    """Atomically lease up to limit claimable sessions; returns how many were claimed
+
+    The claimable condition is repeated on the UPDATE itself, so two workers
+    racing for the same row cannot both win it. On PostgreSQL the candidate
+    rows are picked with FOR UPDATE SKIP LOCKED so racing workers split the
+    backlog instead of queueing on each other (SQLite serializes writers and
+    ignores the clause).
+    """
+    if limit <= 0:
+        return 0
+
+    candidates = (
+        select(SessionModel.id)
+        .where(_claimable(now))
+        .order_by(SessionModel.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(SessionModel)
+        .where(SessionModel.id.in_(candidates.scalar_subquery()), _claimable(now))
+        .values(lease_owner=worker_id, lease_expires_at=now + _lease_period())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def release_sessions(
+    db: AsyncSession,
+    worker_id: str,
+    limit: Optional[int] = None,
+    keep: Collection = (),
+) -> int:
+    """Give up leases (all of them, or the newest limit not in keep) so other workers can claim them"""
+    query = select(SessionModel.id).where(SessionModel.lease_owner == worker_id)
+    if limit is not None:
+        if keep:
+            query = query.where(SessionModel.id.not_in(keep))
+        if limit <= 0:
+            return 0
+        query = query.where(SessionModel.status == "running").order_by(SessionModel.created_at.desc()).limit(limit)
+
+    result = await db.execute(
+        update(SessionModel)
+        .where(SessionModel.id.in_(query.scalar_subquery()), SessionModel.lease_owner == worker_id)
+        .values(lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def sync_leases(db: AsyncSession, worker_id: str = WORKER_ID, busy: Collection = ()) -> int:
+    """Heartbeat, renew, and rebalance this worker's leases to its fair share
+
+    A worker joining makes every other worker's share shrink, so they release
+    their newest sessions (never the busy ones being evaluated); a worker dying
+    stops renewing, so its leases expire and the survivors' larger shares pick
+    them up. Returns the number of sessions this worker owns afterwards.
+    """
+    now = datetime.utcnow()
+    await heartbeat(db, worker_id, now)
+    await db.flush()
+
+    owned = await renew_leases(db, worker_id, now)
+    share = await fair_share(db, now)
+    if owned > share:
+        owned -= await release_sessions(db, worker_id, owned - share, keep=busy)
+    elif owned < share:
+        owned += await claim_sessions(db, worker_id, share - owned, now)
+
+    await db.commit()
+    return owned
+
+
+async def shutdown_leases(db: AsyncSession, worker_id: str = WORKER_ID):
+    """Release every lease and drop the heartbeat so survivors rebalance immediately"""
+    await release_sessions(db, worker_id)
+    await db.execute(
+        delete(WorkerHeartbeat)
+        .where(WorkerHeartbeat.id == worker_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+def holds_lease(session: SessionModel, worker_id: str = WORKER_ID) -> bool:
+    """Whether this worker may still trade the session"""
+    return (
+        session.lease_owner == worker_id
+        and session.lease_expires_at is not None
+        and session.lease_expires_at.replace(tzinfo=None) > datetime.utcnow()
+    )
+
+
+async def fence_lease(db: AsyncSession, session_id, worker_id: str = WORKER_ID) -> bool:
+    """Lock the session row for this unit of work if the worker still holds its lease
+
+    Run right before committing a session's trades: the UPDATE only matches
+    while the lease is live, and the row lock it takes (SQLite: the write
+    lock) keeps another worker from claiming the session until the commit.
+    False means the lease was lost and the trades must be rolled back.
+    """
+    result = await db.execute(
+        update(SessionModel)
+        .where(
+            SessionModel.id == session_id,
+            SessionModel.lease_owner == worker_id,
+            SessionModel.lease_expires_at > datetime.utcnow(),
+        )
+        .values(lease_owner=worker_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
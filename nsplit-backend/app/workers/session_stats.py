@@ -0,0 +1,79 @@
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from decimal import Decimal
+
+from app.models.position import Position
+from app.models.session import Session as SessionModel
+from app.models.session_stats import SessionStats
+
+
+async def ensure_session_stats(db: AsyncSession, session: SessionModel) -> SessionStats:
+    """The session's stats record, rebuilt from its positions if it has none yet
+
+    Only sessions created before stats were tracked need the rebuild; it scans
+    their positions once. Their time in market and peak capital start from
+    what the open positions show.
+    """
+    if session.stats is not None:
+        return session.stats
+
+    holding = Position.status == "holding"
+    sold = Position.status == "sold"
+    totals = (await db.execute(
+        select(
+            func.count(Position.id),
+            func.sum(case((sold, 1), else_=0)),
+            func.sum(case((sold & (Position.realized_profit > 0), 1), else_=0)),
+            func.sum(case((holding, 1), else_=0)),
+            func.coalesce(func.sum(Position.realized_profit), 0),
+            func.coalesce(func.sum(case((holding, Position.buy_price * Position.quantity), else_=0)), 0),
+            func.coalesce(func.max(Position.step_number), 0),
+            func.min(case((holding, Position.buy_time))),
+        ).where(Position.session_id == session.id)
+    )).one()
+    buys, sells, winning_sells, holdings, realized_profit, capital_deployed, max_step, held_since = totals
+
+    capital_deployed = Decimal(str(capital_deployed)).quantize(Decimal("0.01"))
+    session.stats = SessionStats(
+        session_id=session.id,
+        realized_profit=Decimal(str(realized_profit)).quantize(Decimal("0.01")),
+        capital_deployed=capital_deployed,
+        max_capital_deployed=capital_deployed,
+        buy_count=buys or 0,
+        sell_count=sells or 0,
+        winning_sell_count=winning_sells or 0,
+        holding_count=holdings or 0,
+        max_step_reached=max_step,
+        in_market_seconds=0.0,
+        in_market_since=held_since if holdings else None,
+        updated_at=datetime.utcnow(),
+    )
+    return session.stats
+
+
+def record_buy(stats: SessionStats, step: int, price: Decimal, quantity: int, now: datetime):
+    """Fold one filled buy into the stats"""
+    if stats.holding_count == 0:
+        stats.in_market_since = now
+    stats.holding_count += 1
+    stats.buy_count += 1
+    stats.capital_deployed += price * quantity
+    stats.max_capital_deployed = max(stats.max_capital_deployed, stats.capital_deployed)
+    stats.max_step_reached = max(stats.max_step_reached, step)
+    stats.updated_at = now
+
+
+def record_sell(stats: SessionStats, position: Position, now: datetime):
+    """Fold one closed position into the stats"""
+    stats.holding_count -= 1
+    stats.sell_count += 1
+    if position.realized_profit > 0:
+        stats.winning_sell_count += 1
+    stats.realized_profit += position.realized_profit
+    stats.capital_deployed -= position.buy_price * position.quantity
+
+    if stats.holding_count == 0 and stats.in_market_since is not None:
+        stats.in_market_seconds += (now - stats.in_market_since.replace(tzinfo=None)).total_seconds()
+        stats.in_market_since = None
+    stats.updated_at = now
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+import math
+
+
+@dataclass
+class TickerClock:
+    """Per-ticker polling state"""
+
+    last_price: Optional[float] = None
+    last_seen: Optional[float] = None
+    squared_returns: float = 0.0  # decayed sum of squared log returns
+    elapsed: float = 0.0  # decayed sum of seconds between observations
+    samples: int = 0
+    next_due: float = 0.0
+    interval: Optional[float] = None
+
+
+class TickScheduler:
+    """Decides which tickers to poll on each fast tick
+
+    Each ticker's volatility is tracked as a decayed realized variance per
+    second. After an evaluation, the relative distance from the price to the
+    ticker's nearest session trigger gives the expected time for a random
+    walk to get there, (distance / sigma)^2. The ticker is then put in the
+    slowest bucket that still polls it `checks_per_move` times within that
+    time, so near-trigger tickers are polled every fast tick and far ones
+    only every slowest bucket. Until enough returns were seen to estimate the
+    volatility, tickers are polled at the default interval.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float],
+        default_interval: float,
+        checks_per_move: int = 4,
+        decay: float = 0.95,
+        min_samples: int = 5,
+    ):
+        self.buckets = sorted(buckets)
+        self.default_interval = default_interval
+        self.checks_per_move = checks_per_move
+        self.decay = decay
+        self.min_samples = min_samples
+        self._clocks: Dict[str, TickerClock] = {}
+
+    def retain(self, stock_codes: Iterable[str]):
+        """Forget tickers without running sessions"""
+        keep = set(stock_codes)
+        for stock_code in [stock_code for stock_code in self._clocks if stock_code not in keep]:
+            del self._clocks[stock_code]
+
+    def due(self, stock_codes: Iterable[str], now: float) -> List[str]:
+        """Tickers whose next poll is due; unseen tickers are due immediately"""
+        return [
+            stock_code for stock_code in stock_codes
+            if stock_code not in self._clocks or self._clocks[stock_code].next_due <= now
+        ]
+
+    def wake(self, stock_codes: Iterable[str]):
+        """Make tickers due on the next tick, e.g. when a session was started on them"""
+        for stock_code in stock_codes:
+            clock = self._clocks.get(stock_code)
+            if clock is not None:
+                clock.next_due = 0.0
+
+    def postpone(self, stock_codes: Iterable[str], now: float):
+        """Retry tickers after the default interval, e.g. when fetching their prices failed"""
+        for stock_code in stock_codes:
+            self._clocks.setdefault(stock_code, TickerClock()).next_due = now + self.default_interval
+
+    def observe(self, stock_code: str, price: float, now: float):
+        """Fold a new price sample into the ticker's volatility estimate"""
+        clock = self._clocks.setdefault(stock_code, TickerClock())
+        if clock.last_price and price > 0 and clock.last_seen is not None and now > clock.last_seen:
+            log_return = math.log(price / clock.last_price)
+            clock.squared_returns = self.decay * clock.squared_returns + log_return * log_return
+            clock.elapsed = self.decay * clock.elapsed + (now - clock.last_seen)
+            clock.samples += 1
+        clock.last_price = price
+        clock.last_seen = now
+
+    def volatility(self, stock_code: str) -> Optional[float]:
+        """Estimated standard deviation of log returns per sqrt(second)"""
+        clock = self._clocks.get(stock_code)
+        if clock is None or clock.samples < self.min_samples or clock.elapsed <= 0:
+            return None
+        return math.sqrt(clock.squared_returns / clock.elapsed)
+
+    def interval_for(self, stock_code: str, distance: float) -> float:
+        """Poll interval bucket for a ticker whose nearest trigger is `distance` (relative) away"""
+        if distance <= 0:
+            return self.buckets[0]
+
+        sigma = self.volatility(stock_code)
+        if not sigma:
+            return self.default_interval
+
+        budget = (distance / sigma) ** 2 / self.checks_per_move
+        interval = self.buckets[0]
+        for bucket in self.buckets:
+            if bucket <= budget:
+                interval = bucket
+        return interval
+
+    def schedule(self, stock_code: str, distance: float, now: float) -> float:
+        """Set the ticker's next poll from its distance to the nearest trigger"""
+        clock = self._clocks.setdefault(stock_code, TickerClock())
+        clock.interval = self.interval_for(stock_code, distance)
+        clock.next_due = now + clock.interval
+        return clock.interval
+
+    def intervals(self) -> Dict[str, Optional[float]]:
+        return {stock_code: clock.interval for stock_code, clock in self._clocks.items()}
@@ -0,0 +1,141 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway database first
+_db_dir = tempfile.mkdtemp(prefix="nsplit-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ["WORKER_ENABLED"] = "false"
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+import uuid
+
+import httpx
+import pytest
+
+from app.auth import create_access_token
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.session import Session as SessionModel
+from app.models.session_stats import SessionStats
+from app.models.user import User
+from app.services.simulator_client import SimulatorClient
+from app.workers import auto_trading_worker
+from app.workers.event_journal import EventJournal
+from app.workers.session_leases import WORKER_ID
+
+
+class FakeSimulator:
+    """Stands in for the simulator client, with the simulator's idempotency semantics
+
+    Every order fills unless its idempotency key is in `reject`; a key seen
+    before replays its original fill instead of filling again.
+    """
+
+    build_order = staticmethod(SimulatorClient.build_order)
+
+    def __init__(self):
+        self.prices: Dict[str, Decimal] = {}
+        self.submitted: List[Dict[str, Any]] = []
+        self.fills: Dict[str, Dict[str, Any]] = {}
+        self.reject = set()
+        self.on_submit = None  # awaited before the results come back, e.g. to race the worker
+
+    async def get_current_prices(self, stock_codes):
+        return {code: self.prices[code] for code in stock_codes}
+
+    async def submit_orders(self, orders):
+        self.submitted.extend(orders)
+        results = []
+        for order in orders:
+            key = order["idempotency_key"]
+            if key in self.reject:
+                results.append({"status": "rejected", "status_code": 400, "order": None, "error": "Insufficient balance"})
+                continue
+            if key in self.fills:
+                results.append({"status": "replayed", "status_code": 200, "order": self.fills[key], "error": None})
+                continue
+            # Prices come back as the simulator serializes its Numeric(12, 2) column
+            self.fills[key] = {**order, "id": str(uuid.uuid4()), "price": str(Decimal(str(order["price"])).quantize(Decimal("0.01")))}
+            results.append({"status": "filled", "status_code": 201, "order": self.fills[key], "error": None})
+
+        if self.on_submit is not None:
+            await self.on_submit()
+        return results
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """A session on freshly created tables"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with SessionLocal() as session:
+        yield session
+
+    # Pooled aiosqlite connections are tied to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def user(db):
+    user = User(google_id="dev_test", email="test@dev.local", name="test")
+    db.add(user)
+    await db.commit()
+    return user
+
+
+@pytest.fixture
+async def client(user):
+    """API client authenticated as `user`"""
+    token = create_access_token(data={"user_id": str(user.id), "email": user.email})
+    async with httpx.AsyncClient(
+        app=app,
+        base_url="http://test/api",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def event_journal(monkeypatch):
+    """A journal of this test's events only"""
+    journal = EventJournal()
+    monkeypatch.setattr(auto_trading_worker, "event_journal", journal)
+    return journal
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    fake = FakeSimulator()
+    monkeypatch.setattr(auto_trading_worker, "simulator_client", fake)
+    return fake
+
+
+@pytest.fixture
+async def running_session(db, user):
+    """A running 3-step session at 100 (5% buy / 3% sell triggers) leased to this worker"""
+    session = SessionModel(
+        user_id=user.id,
+        stock_code="005930",
+        stock_name="Samsung",
+        initial_buy_price=Decimal("100"),
+        amount_per_step=Decimal("1000"),
+        max_steps=3,
+        sell_trigger_pct=Decimal("3"),
+        buy_trigger_pct=Decimal("5"),
+        status="running",
+        lease_owner=WORKER_ID,
+        lease_expires_at=datetime.utcnow() + timedelta(minutes=5),
+        stats=SessionStats(),
+    )
+    db.add(session)
+    await db.commit()
+    return session
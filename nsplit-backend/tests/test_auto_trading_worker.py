@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import time
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal, engine
+from app.models.position import Position
+from app.models.session import Session as SessionModel
+from app.models.session_event import SessionEvent
+from app.workers import auto_trading_worker
+from app.workers.auto_trading_worker import dispatch_sessions, evaluate_session, flush_event_journal
+from app.workers.tick_scheduler import TickScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+async def evaluate(session_id, price):
+    async with SessionLocal() as db:
+        await evaluate_session(db, session_id, Decimal(price))
+
+
+async def load(session_id) -> SessionModel:
+    async with SessionLocal() as db:
+        return await db.get(SessionModel, session_id)
+
+
+def buy_keys(simulator):
+    return [order["idempotency_key"] for order in simulator.submitted if order["order_type"] == "buy"]
+
+
+def fail_next_commit(monkeypatch):
+    commit = AsyncSession.commit
+    failures = [RuntimeError("database is locked")]
+
+    async def commit_failing_once(self):
+        if failures:
+            raise failures.pop()
+        await commit(self)
+
+    monkeypatch.setattr(AsyncSession, "commit", commit_failing_once)
+
+
+async def resume(session_id):
+    async with SessionLocal() as db:
+        session = await db.get(SessionModel, session_id)
+        session.status = "running"
+        await db.commit()
+
+
+async def test_buy_retried_after_failed_commit_reuses_its_key(running_session, simulator, monkeypatch):
+    fail_next_commit(monkeypatch)
+    await evaluate(running_session.id, "100")
+
+    # The fill happened on the simulator, but the position was rolled back
+    session = await load(running_session.id)
+    assert session.status == "paused"
+
+    await resume(running_session.id)
+    await evaluate(running_session.id, "100")
+
+    keys = buy_keys(simulator)
+    assert len(keys) == 2 and keys[0] == keys[1]
+    assert len(simulator.fills) == 1
+
+    async with SessionLocal() as db:
+        positions = (await db.scalars(select(Position).where(Position.session_id == running_session.id))).all()
+    assert [(p.step_number, p.status) for p in positions] == [(1, "holding")]
+
+
+async def test_sell_retried_at_a_later_tick_records_the_original_fill(running_session, simulator, monkeypatch):
+    await evaluate(running_session.id, "100")
+
+    fail_next_commit(monkeypatch)
+    await evaluate(running_session.id, "103")
+    await resume(running_session.id)
+
+    # The simulator replays the fill at 103, not the retry's 106
+    await evaluate(running_session.id, "106")
+
+    async with SessionLocal() as db:
+        session = await db.get(SessionModel, running_session.id)
+        position = await db.scalar(select(Position).where(Position.session_id == running_session.id))
+    assert (position.sell_price, position.realized_profit) == (Decimal("103.00"), Decimal("30.00"))
+    assert (session.status, session.stats.realized_profit) == ("completed", Decimal("30.00"))
+
+
+async def test_replayed_buy_records_the_original_fill(running_session, simulator):
+    key = f"buy:{running_session.id}:1:0"
+    simulator.fills[key] = {"id": "replayed", "idempotency_key": key, "price": "99.50", "quantity": 10}
+
+    await evaluate(running_session.id, "100")
+
+    async with SessionLocal() as db:
+        session = await db.get(SessionModel, running_session.id)
+        position = await db.scalar(select(Position).where(Position.session_id == running_session.id))
+    assert position.buy_price == Decimal("99.50")
+    assert session.stats.capital_deployed == Decimal("995.00")
+
+
+async def test_rebuying_a_sold_step_uses_a_new_key(db, running_session, simulator):
+    db.add(Position(
+        session_id=running_session.id,
+        step_number=1,
+        buy_price=Decimal("100"),
+        quantity=10,
+        buy_time=datetime.utcnow(),
+        sell_target_price=Decimal("103"),
+        sell_price=Decimal("103"),
+        sell_time=datetime.utcnow(),
+        realized_profit=Decimal("30"),
+        status="sold",
+    ))
+    await db.commit()
+
+    await evaluate(running_session.id, "100")
+
+    assert buy_keys(simulator) == [f"buy:{running_session.id}:1:1"]
+
+
+async def test_trades_are_not_committed_after_the_lease_moves(running_session, simulator):
+    async def lease_taken_over():
+        async with SessionLocal() as db:
+            session = await db.get(SessionModel, running_session.id)
+            session.lease_owner = "other-worker"
+            await db.commit()
+
+    simulator.on_submit = lease_taken_over
+    await evaluate(running_session.id, "100")
+
+    session = await load(running_session.id)
+    assert (session.status, session.lease_owner, session.current_step) == ("running", "other-worker", 0)
+    async with SessionLocal() as db:
+        assert (await db.scalars(select(Position).where(Position.session_id == running_session.id))).all() == []
+
+
+async def test_expired_lease_is_not_traded(db, running_session, simulator):
+    running_session.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    await db.commit()
+
+    await evaluate(running_session.id, "100")
+
+    assert simulator.submitted == []
+
+
+async def test_rejected_order_keeps_the_fills_of_its_batch(running_session, simulator, event_journal):
+    simulator.reject.add(f"buy:{running_session.id}:2:0")
+
+    # 90 is below every step of the 100 / 95 / 90.25 ladder: all three buy in one batch
+    await evaluate(running_session.id, "90")
+
+    async with SessionLocal() as db:
+        session = await db.get(SessionModel, running_session.id)
+        positions = (await db.scalars(select(Position).where(Position.session_id == running_session.id))).all()
+    assert sorted(p.step_number for p in positions) == [1, 3]
+    assert (session.status, session.current_step, session.stats.buy_count) == ("paused", 3, 2)
+
+    # The pause's reason is committed with it, ahead of the journaled buys
+    async with SessionLocal() as db:
+        events = (await db.scalars(select(SessionEvent).where(SessionEvent.session_id == running_session.id))).all()
+    assert [event.event_type for event in events] == ["error"]
+
+    await flush_event_journal()
+    async with SessionLocal() as db:
+        events = (await db.scalars(select(SessionEvent).where(SessionEvent.session_id == running_session.id))).all()
+    assert sorted(event.event_type for event in events) == ["buy", "buy", "error"]
+    assert "step 2" in next(event.message for event in events if event.event_type == "error")
+
+
+async def test_ticker_pruned_while_its_sessions_load_is_skipped(running_session, simulator, monkeypatch):
+    monkeypatch.setattr(auto_trading_worker, "_books", {})
+
+    # A refresh drops the ticker while the dispatch is waiting on the database
+    def pruned_by_refresh(*args):
+        auto_trading_worker._books.clear()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", pruned_by_refresh)
+    try:
+        await dispatch_sessions({"005930": [running_session.id]}, {"005930": Decimal("90")})
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", pruned_by_refresh)
+
+    assert simulator.submitted == []
+
+
+async def test_ticker_without_a_price_is_polled_again_after_the_default_interval(running_session, simulator, monkeypatch):
+    scheduler = TickScheduler(buckets=[1.0, 5.0], default_interval=5.0)
+    monkeypatch.setattr(auto_trading_worker, "tick_scheduler", scheduler)
+    monkeypatch.setattr(auto_trading_worker, "_books", {})
+
+    await dispatch_sessions({"005930": [running_session.id]}, {})
+
+    now = time.monotonic()
+    assert scheduler.due(["005930"], now) == []
+    assert scheduler.due(["005930"], now + 5.0) == ["005930"]
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.session_event import SessionEvent
+from app.services.event_broadcaster import event_broadcaster
+from app.workers.auto_trading_worker import evaluate_session, flush_event_journal
+
+pytestmark = pytest.mark.anyio
+
+
+async def evaluate(session_id, price):
+    async with SessionLocal() as db:
+        await evaluate_session(db, session_id, Decimal(price))
+
+
+async def test_journaled_events_land_ahead_of_a_held_cursor(db, client, running_session, simulator):
+    start = datetime.utcnow() - timedelta(minutes=1)
+    for i in range(3):
+        db.add(SessionEvent(
+            session_id=running_session.id,
+            event_type="start",
+            message=f"event {i}",
+            created_at=start + timedelta(seconds=i),
+        ))
+    await db.commit()
+
+    # The buys happen, a route writes its event directly and a client reads
+    # the newest page, all before the journal writes the buys
+    await evaluate(running_session.id, "90")
+    db.add(SessionEvent(
+        session_id=running_session.id,
+        event_type="pause",
+        message="paused",
+        created_at=datetime.utcnow(),  # SQLite's now() only has whole seconds
+    ))
+    await db.commit()
+    first = await client.get(f"/sessions/{running_session.id}/events", params={"limit": 1})
+    assert [event["message"] for event in first.json()] == ["paused"]
+    await flush_event_journal()
+
+    older = await client.get(
+        f"/sessions/{running_session.id}/events",
+        params={"limit": 10, "cursor": first.headers["X-Next-Cursor"]},
+    )
+    assert [event["message"] for event in older.json()] == ["event 2", "event 1", "event 0"]
+
+    latest = await client.get(f"/sessions/{running_session.id}/events", params={"limit": 4})
+    assert [event["event_type"] for event in latest.json()] == ["buy", "buy", "buy", "pause"]
+
+
+async def test_journaled_events_are_streamed_once_written(user, running_session, simulator, event_journal):
+    event_journal.batch_size = 2
+    queue = event_broadcaster.subscribe(user.id)
+    try:
+        await evaluate(running_session.id, "90")
+        assert queue.empty()
+
+        await flush_event_journal()
+        messages = [queue.get_nowait() for _ in range(queue.qsize())]
+    finally:
+        event_broadcaster.unsubscribe(user.id, queue)
+
+    assert [message["type"] for message in messages] == ["event", "event", "event", "session"]
+    assert messages[-1]["data"] == {"id": str(running_session.id), "status": "running", "current_step": 3}
+
+    async with SessionLocal() as db:
+        written = {str(event.id): event.created_at for event in await db.scalars(
+            select(SessionEvent).where(SessionEvent.session_id == running_session.id)
+        )}
+    assert {message["data"]["id"]: datetime.fromisoformat(message["data"]["created_at"])
+            for message in messages[:-1]} == written
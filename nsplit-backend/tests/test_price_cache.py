@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models.ticker_price import TickerPrice
+from app.services.price_cache import PriceCache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_lookup_prefers_the_fresher_source(db):
+    now = datetime.utcnow()
+    cache = PriceCache()
+    cache.update({"005930": Decimal("100"), "000660": Decimal("200")}, observed_at=now)
+    # Another worker took over 005930 and flushed a newer price
+    db.add(TickerPrice(stock_code="005930", price=Decimal("105"), observed_at=now + timedelta(seconds=5)))
+    db.add(TickerPrice(stock_code="000660", price=Decimal("190"), observed_at=now - timedelta(seconds=5)))
+    db.add(TickerPrice(stock_code="035720", price=Decimal("300"), observed_at=now))
+    await db.commit()
+
+    quotes = await cache.lookup(db, ["005930", "000660", "035720", "051910"])
+
+    assert {code: quote.price for code, quote in quotes.items()} == {
+        "005930": Decimal("105"),
+        "000660": Decimal("200"),
+        "035720": Decimal("300"),
+    }
+
+
+async def test_retain_drops_unleased_codes_once_flushed(db):
+    cache = PriceCache()
+    cache.update({"005930": Decimal("100"), "000660": Decimal("200")})
+
+    cache.retain(["005930"])
+    assert cache.get("000660") is not None
+
+    await cache.flush(db)
+    cache.retain(["005930"])
+    assert cache.get("000660") is None
+    assert cache.get("005930").price == Decimal("100")
+    assert (await cache.lookup(db, ["000660"]))["000660"].price == Decimal("200")
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.models.session import Session as SessionModel
+from app.models.session_event import SessionEvent
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def timeline(db, user):
+    """A session with 60 events, the first 10 sharing one timestamp"""
+    session = SessionModel(
+        user_id=user.id,
+        stock_code="005930",
+        stock_name="Samsung",
+        amount_per_step=Decimal("1000"),
+        max_steps=3,
+        sell_trigger_pct=Decimal("3"),
+        buy_trigger_pct=Decimal("5"),
+    )
+    db.add(session)
+    await db.flush()
+
+    start = datetime(2024, 1, 1)
+    for i in range(60):
+        db.add(SessionEvent(
+            session_id=session.id,
+            event_type="buy" if i % 2 else "sell",
+            message=f"event {i}",
+            created_at=start + timedelta(seconds=max(i - 9, 0)),
+        ))
+    await db.commit()
+    return session
+
+
+async def test_whole_timeline_without_a_limit(client, timeline):
+    response = await client.get(f"/sessions/{timeline.id}/events")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 60
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_pages_cover_the_timeline_once_in_order(client, timeline):
+    full = [item["id"] for item in (await client.get(f"/sessions/{timeline.id}/events")).json()]
+
+    paged, cursor = [], None
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(f"/sessions/{timeline.id}/events", params=params)
+        paged += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert paged == full
+
+
+async def test_event_type_filter(client, timeline):
+    response = await client.get(f"/sessions/{timeline.id}/events", params={"event_type": "buy"})
+
+    assert {item["event_type"] for item in response.json()} == {"buy"}
+    assert len(response.json()) == 30
+
+
+async def test_unchanged_page_is_a_304_without_loading_it(client, db, timeline):
+    params = {"limit": 20}
+    etag = (await client.get(f"/sessions/{timeline.id}/events", params=params)).headers["ETag"]
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        response = await client.get(f"/sessions/{timeline.id}/events", params=params, headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 304
+    assert not any("ORDER BY session_events.created_at" in statement for statement in statements)
+
+    db.add(SessionEvent(session_id=timeline.id, event_type="pause", message="Session paused"))
+    await db.commit()
+
+    response = await client.get(f"/sessions/{timeline.id}/events", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
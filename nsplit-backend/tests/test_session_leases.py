@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.session import Session as SessionModel
+from app.workers.session_leases import fence_lease, sync_leases
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_running_sessions(db, user, count):
+    for _ in range(count):
+        db.add(SessionModel(
+            user_id=user.id,
+            stock_code="005930",
+            stock_name="Samsung",
+            amount_per_step=Decimal("1000"),
+            max_steps=3,
+            sell_trigger_pct=Decimal("3"),
+            buy_trigger_pct=Decimal("5"),
+            status="running",
+        ))
+    await db.commit()
+
+
+async def owned_by(db, worker_id) -> int:
+    return await db.scalar(select(func.count(SessionModel.id)).where(SessionModel.lease_owner == worker_id))
+
+
+async def test_sessions_are_rebalanced_when_a_worker_joins(db, user):
+    await add_running_sessions(db, user, 4)
+
+    assert await sync_leases(db, "worker-a") == 4
+
+    # b's share is 2, but every session is still leased to a
+    assert await sync_leases(db, "worker-b") == 0
+    assert await sync_leases(db, "worker-a") == 2
+    assert await sync_leases(db, "worker-b") == 2
+    assert (await owned_by(db, "worker-a"), await owned_by(db, "worker-b")) == (2, 2)
+
+
+async def test_fence_only_matches_the_lease_owner(db, user):
+    await add_running_sessions(db, user, 1)
+    await sync_leases(db, "worker-a")
+    session_id = await db.scalar(select(SessionModel.id))
+
+    assert await fence_lease(db, session_id, "worker-b") is False
+    assert await fence_lease(db, session_id, "worker-a") is True
+    await db.rollback()
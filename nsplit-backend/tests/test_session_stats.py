@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.session import Session as SessionModel
+from app.workers.auto_trading_worker import evaluate_session
+from app.workers.session_stats import ensure_session_stats
+
+pytestmark = pytest.mark.anyio
+
+STAT_FIELDS = (
+    "realized_profit", "capital_deployed", "buy_count", "sell_count",
+    "winning_sell_count", "holding_count", "max_step_reached",
+)
+
+
+async def test_incremental_stats_match_a_rebuild_from_positions(running_session, simulator):
+    for price in ("90", "93", "88", "86", "91", "97"):
+        async with SessionLocal() as db:
+            await evaluate_session(db, running_session.id, Decimal(price))
+
+    async with SessionLocal() as db:
+        session = await db.get(SessionModel, running_session.id)
+        incremental = {field: getattr(session.stats, field) for field in STAT_FIELDS}
+        rebuilt = await ensure_session_stats(db, SessionModel(id=session.id))
+        assert {field: getattr(rebuilt, field) for field in STAT_FIELDS} == incremental
+
+    assert (incremental["sell_count"], incremental["holding_count"]) == (1, 2)
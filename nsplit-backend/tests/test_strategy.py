@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.strategy.backtest import Backtest, BacktestPosition, StrategyParams, run_backtest
+from app.strategy.evaluator import evaluate_ladder
+from app.strategy.ladder import build_price_ladder
+
+# 100 / 95 / 90.25 with 3% sell targets
+LADDER = build_price_ladder(Decimal("100"), 3, Decimal("5"), Decimal("3"))
+# Starts well below its first buy price, so the first tick fills several steps
+PARAMS = StrategyParams(
+    amount_per_step=Decimal("1000"),
+    max_steps=10,
+    sell_trigger_pct=Decimal("3"),
+    buy_trigger_pct=Decimal("2"),
+    initial_buy_price=Decimal("115"),
+)
+
+
+def holding(step):
+    rung = LADDER[step - 1]
+    return BacktestPosition(
+        step_number=step,
+        buy_price=rung.buy_price,
+        quantity=int(Decimal("1000") / rung.buy_price),
+        sell_target_price=rung.sell_target_price,
+        buy_tick=0,
+    )
+
+
+def test_price_below_the_ladder_buys_every_step():
+    evaluation = evaluate_ladder(LADDER, [], Decimal("90"), Decimal("1000"), 0)
+
+    assert [(buy.step, buy.price, buy.quantity) for buy in evaluation.buys] == [
+        (1, Decimal("100.00"), 10), (2, Decimal("95.00"), 10), (3, Decimal("90.25"), 11),
+    ]
+
+
+def test_sold_deeper_step_is_not_rebought_while_a_shallower_one_is_held():
+    holdings = [holding(1), holding(3)]
+
+    evaluation = evaluate_ladder(LADDER, holdings, Decimal("93"), Decimal("1000"), 3)
+    assert [sell.holding.step_number for sell in evaluation.sells] == [3]
+    assert evaluation.buys == [] and not evaluation.completed
+
+
+def test_session_completes_once_everything_is_sold():
+    evaluation = evaluate_ladder(LADDER, [holding(1), holding(2)], Decimal("103"), Decimal("1000"), 2)
+
+    assert [sell.holding.step_number for sell in evaluation.sells] == [1, 2]
+    assert evaluation.completed and evaluation.buys == []
+
+
+def replay_every_tick(params, prices):
+    """The strategy evaluated on every single tick, as the worker would"""
+    ladder, holdings, current_step, events = None, [], 0, []
+    for tick, value in enumerate(prices):
+        price = Decimal(repr(float(value)))
+        ladder = ladder or build_price_ladder(
+            params.initial_buy_price or price, params.max_steps, params.buy_trigger_pct, params.sell_trigger_pct,
+        )
+        evaluation = evaluate_ladder(ladder, holdings, price, params.amount_per_step, current_step)
+        for sell in evaluation.sells:
+            holdings.remove(sell.holding)
+            events.append((tick, "sell", sell.holding.step_number))
+        if evaluation.completed:
+            events.append((tick, "complete", None))
+            break
+        for buy in evaluation.buys:
+            holdings.append(BacktestPosition(buy.step, buy.price, buy.quantity, buy.sell_target_price, tick))
+            current_step = max(current_step, buy.step)
+            events.append((tick, "buy", buy.step))
+    return events
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_backtest_skipping_quiet_ticks_matches_a_tick_by_tick_replay(seed):
+    rng = np.random.default_rng(seed)
+    prices = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 20_000))), 2)
+
+    result = run_backtest(PARAMS, prices)
+
+    assert len(result.events) > 10
+    assert [(e.tick, e.event_type, e.step) for e in result.events] == replay_every_tick(PARAMS, prices)
+
+
+def test_backtest_is_independent_of_chunking():
+    rng = np.random.default_rng(7)
+    prices = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 20_000))), 2)
+
+    whole = run_backtest(PARAMS, prices)
+    chunked = Backtest(PARAMS, max_scan_chunk=64)
+    for chunk in np.array_split(prices, 37):
+        chunked.feed(chunk)
+
+    assert chunked.result().summary() == whole.summary()
+    assert chunked.result().events == whole.events
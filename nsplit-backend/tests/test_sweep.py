@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.sweep import SessionSuggestRequest
+
+
+def suggest_request(**overrides) -> SessionSuggestRequest:
+    fields = {"stock_code": "005930", "amount_per_step": [Decimal("100000")]}
+    fields.update(overrides)
+    return SessionSuggestRequest(**fields)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"amount_per_step": [Decimal("0")]},
+    {"max_steps": [0]},
+    {"max_steps": [3, 11]},
+    {"sell_trigger_pct": [Decimal("0.5")]},
+    {"buy_trigger_pct": [Decimal("100")]},
+])
+def test_candidates_outside_session_bounds_are_rejected(overrides):
+    with pytest.raises(ValidationError):
+        suggest_request(**overrides)
+
+
+def test_candidates_within_session_bounds_are_accepted():
+    request = suggest_request(max_steps=[1, 10], sell_trigger_pct=[Decimal("1"), Decimal("20")], buy_trigger_pct=[Decimal("5")])
+    assert request.max_steps == [1, 10]
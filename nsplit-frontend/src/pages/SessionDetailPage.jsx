@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { sessionAPI } from '../services/api';
+import { sessionAPI, streamSessionEvents } from '../services/api';
 
 const SessionDetailPage = () => {
   const { id } = useParams();
@@ -8,18 +8,16 @@ const SessionDetailPage = () => {
   const [session, setSession] = useState(null);
   const [events, setEvents] = useState([]);
   const [loading, setLoading] = useState(true);
-  const [refreshInterval, setRefreshInterval] = useState(null);
 
   useEffect(() => {
     loadData();
 
-    // Auto-refresh every 5 seconds
-    const interval = setInterval(loadData, 5000);
-    setRefreshInterval(interval);
-
-    return () => {
-      if (interval) clearInterval(interval);
-    };
+    // Live updates instead of polling; a reconnect reloads what was missed
+    return streamSessionEvents({
+      sessionId: id,
+      onReconnect: loadData,
+      onMessage: handleStreamMessage,
+    });
   }, [id]);
 
   const loadData = async () => {
@@ -37,6 +35,31 @@ const SessionDetailPage = () => {
     }
   };
 
+  const loadSession = async () => {
+    try {
+      const sessionRes = await sessionAPI.get(id);
+      setSession(sessionRes.data);
+    } catch (error) {
+      console.error('Failed to load session:', error);
+    }
+  };
+
+  const handleStreamMessage = ({ type, data }) => {
+    if (type === 'event') {
+      setEvents((current) => (current.some((event) => event.id === data.id) ? current : [data, ...current]));
+      // Trades change the positions
+      if (data.event_type === 'buy' || data.event_type === 'sell') loadSession();
+    } else if (type === 'session') {
+      if (data.status === 'deleted') {
+        navigate('/sessions');
+        return;
+      }
+      setSession((current) => current && { ...current, status: data.status, current_step: data.current_step });
+    } else if (type === 'resync') {
+      loadData();
+    }
+  };
+
   const handleStart = async () => {
     try {
       await sessionAPI.start(id);
@@ -176,6 +199,33 @@ const SessionDetailPage = () => {
           </div>
         </div>
 
+        {/* Price Ladder */}
+        {session.price_ladder && session.price_ladder.length > 0 && (
+          <div className="bg-white rounded-lg shadow p-6 mb-6">
+            <h2 className="text-xl font-bold mb-4">Price Ladder</h2>
+            <div className="overflow-x-auto">
+              <table className="min-w-full">
+                <thead>
+                  <tr className="border-b">
+                    <th className="text-left py-2">Step</th>
+                    <th className="text-left py-2">Buy Price</th>
+                    <th className="text-left py-2">Target Price</th>
+                  </tr>
+                </thead>
+                <tbody>
+                  {session.price_ladder.map((rung) => (
+                    <tr key={rung.step} className="border-b">
+                      <td className="py-2">{rung.step}</td>
+                      <td className="py-2">{Number(rung.buy_price).toLocaleString()}</td>
+                      <td className="py-2">{Number(rung.sell_target_price).toLocaleString()}</td>
+                    </tr>
+                  ))}
+                </tbody>
+              </table>
+            </div>
+          </div>
+        )}
+
         {/* Positions */}
         <div className="bg-white rounded-lg shadow p-6 mb-6">
           <h2 className="text-xl font-bold mb-4">Positions</h2>
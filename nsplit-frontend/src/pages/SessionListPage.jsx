@@ -1,6 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { sessionAPI } from '../services/api';
+import { sessionAPI, streamSessionEvents } from '../services/api';
 import { useAuth } from '../contexts/AuthContext';
 
 const SessionListPage = () => {
@@ -9,11 +9,42 @@ const SessionListPage = () => {
   const [sessions, setSessions] = useState([]);
   const [filter, setFilter] = useState('all');
   const [loading, setLoading] = useState(true);
+  // Latest list for stream handlers, which outlive a render
+  const sessionsRef = useRef(sessions);
+  sessionsRef.current = sessions;
 
   useEffect(() => {
     loadSessions();
+
+    // Status changes arrive live; a reconnect reloads what was missed
+    return streamSessionEvents({
+      onReconnect: loadSessions,
+      onMessage: handleStreamMessage,
+    });
   }, [filter]);
 
+  const handleStreamMessage = ({ type, data }) => {
+    if (type === 'resync') {
+      loadSessions();
+      return;
+    }
+    if (type !== 'session') return;
+
+    const visible = data.status !== 'deleted' && (filter === 'all' || data.status === filter);
+    if (!sessionsRef.current.some((session) => session.id === data.id)) {
+      // A session entering the filter: fetch it with the rest of the list
+      if (visible) loadSessions();
+      return;
+    }
+    setSessions((current) => (
+      visible
+        ? current.map((session) => (
+          session.id === data.id ? { ...session, status: data.status, current_step: data.current_step } : session
+        ))
+        : current.filter((session) => session.id !== data.id)
+    ));
+  };
+
   const loadSessions = async () => {
     try {
       const statusFilter = filter === 'all' ? undefined : filter;
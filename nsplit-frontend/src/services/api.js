@@ -55,6 +55,70 @@ export const sessionAPI = {
   getEvents: (id) => api.get(`/sessions/${id}/events`),
 };
 
+// Session event stream: server-sent events read over fetch, since EventSource cannot send the auth header.
+// Calls onReconnect after every reconnect, so callers can reload what they missed, and returns a function that closes the stream.
+export const streamSessionEvents = ({ sessionId, onMessage, onReconnect }) => {
+  const controller = new AbortController();
+  const query = sessionId ? `?session_id=${sessionId}` : '';
+
+  const parseFrame = (frame) => {
+    let type = 'message';
+    const data = [];
+    for (const line of frame.split('\n')) {
+      if (line.startsWith('event:')) type = line.slice(6).trim();
+      else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+    }
+    // Comment-only frames are keepalives
+    return data.length ? { type, data: JSON.parse(data.join('\n')) } : null;
+  };
+
+  const run = async () => {
+    let retryDelay = 1000;
+    let connected = false;
+    while (!controller.signal.aborted) {
+      try {
+        const response = await fetch(`${API_URL}/api/sessions/stream${query}`, {
+          headers: { Authorization: `Bearer ${localStorage.getItem('token')}` },
+          signal: controller.signal,
+        });
+        if (response.status === 401) {
+          localStorage.removeItem('token');
+          window.location.href = '/login';
+          return;
+        }
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+        retryDelay = 1000;
+        if (connected) onReconnect?.();
+        connected = true;
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          let boundary;
+          while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = parseFrame(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            if (message) onMessage(message);
+          }
+        }
+      } catch (error) {
+        if (controller.signal.aborted) return;
+        console.error('Session event stream disconnected:', error);
+      }
+
+      await new Promise((resolve) => setTimeout(resolve, retryDelay));
+      retryDelay = Math.min(retryDelay * 2, 30000);
+    }
+  };
+
+  run();
+  return () => controller.abort();
+};
+
 // Position API
 export const positionAPI = {
   listBySession: (sessionId) => api.get(`/positions/session/${sessionId}`),
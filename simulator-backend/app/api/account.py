@@ -1,5 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
 from uuid import UUID
 
 from app.database import get_db
@@ -11,17 +14,25 @@ from app.config import settings
 router = APIRouter(prefix="/account", tags=["account"])
 
 
+async def load_account(db: AsyncSession, user_id) -> Optional[SimAccount]:
+    """Load an account with its stock holdings (AccountResponse serializes them)"""
+    return await db.scalar(
+        select(SimAccount)
+        .where(SimAccount.user_id == user_id)
+        .options(selectinload(SimAccount.stocks))
+        .execution_options(populate_existing=True)
+    )
+
+
 @router.post("/create", response_model=AccountResponse, status_code=status.HTTP_201_CREATED)
 async def create_account(
     account_data: AccountCreate,
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a new simulator account"""
     # Check if account already exists
-    existing = db.query(SimAccount).filter(
-        SimAccount.user_id == account_data.user_id
-    ).first()
+    existing = await load_account(db, account_data.user_id)
 
     if existing:
         return existing
@@ -32,22 +43,19 @@ async def create_account(
         cash=settings.DEFAULT_INITIAL_CASH,
     )
     db.add(account)
-    db.commit()
-    db.refresh(account)
+    await db.commit()
 
-    return account
+    return await load_account(db, account.user_id)
 
 
 @router.get("/{user_id}", response_model=AccountResponse)
 async def get_account(
     user_id: str,
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get account details"""
-    account = db.query(SimAccount).filter(
-        SimAccount.user_id == user_id
-    ).first()
+    account = await load_account(db, user_id)
 
     if not account:
         raise HTTPException(
@@ -62,12 +70,10 @@ async def get_account(
 async def reset_account(
     user_id: str,
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Reset account to initial state"""
-    account = db.query(SimAccount).filter(
-        SimAccount.user_id == user_id
-    ).first()
+    account = await load_account(db, user_id)
 
     if not account:
         raise HTTPException(
@@ -81,9 +87,8 @@ async def reset_account(
     # Delete all stocks (cascade will handle this)
     # But we'll do it explicitly for clarity
     for stock in account.stocks:
-        db.delete(stock)
+        await db.delete(stock)
 
-    db.commit()
-    db.refresh(account)
+    await db.commit()
 
-    return account
+    return await load_account(db, user_id)
@@ -1,30 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 from decimal import Decimal
+import csv
+import io
+import json
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.dependencies import verify_api_key
-from app.schemas.order import OrderCreate, OrderResponse
+from app.schemas.order import OrderCreate, OrderResponse, BatchOrderRequest, BatchOrderResult
 from app.models.account import SimAccount
 from app.models.order import SimOrder
 from app.engine.order_executor import order_executor
 
 router = APIRouter(prefix="/order", tags=["order"])
 
+# Columns of the NDJSON/CSV export, in order
+EXPORT_COLUMNS = ("id", "account_id", "stock_code", "order_type", "price", "quantity", "status", "executed_at")
+EXPORT_CHUNK_SIZE = 1000
+
+
+async def find_replayed_order(
+    db: AsyncSession,
+    account: SimAccount,
+    order_data: OrderCreate,
+    order_type: str,
+) -> Optional[SimOrder]:
+    """Return the order already executed for this idempotency key, if any
+
+    Only the order's type, stock and quantity have to match: a retry may be
+    sent at a newer price, and gets the original fill back. Callers take the
+    price of the returned order as what they traded at.
+    """
+    if not order_data.idempotency_key:
+        return None
+
+    order = await db.scalar(select(SimOrder).where(
+        SimOrder.account_id == account.id,
+        SimOrder.idempotency_key == order_data.idempotency_key,
+    ))
+
+    if order and (order.order_type != order_type or order.stock_code != order_data.stock_code
+                  or order.quantity != order_data.quantity):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency key was already used for a different order",
+        )
+
+    return order
+
+
+async def execute_idempotent(
+    db: AsyncSession,
+    account: SimAccount,
+    order_data: OrderCreate,
+    order_type: str,
+    execute,
+) -> Tuple[SimOrder, bool]:
+    """Execute an order once per idempotency key, replaying the original on retries
+
+    Returns the order and whether it was replayed.
+    """
+    replayed = await find_replayed_order(db, account, order_data, order_type)
+    if replayed:
+        return replayed, True
+
+    try:
+        order = await execute(
+            db=db,
+            account=account,
+            stock_code=order_data.stock_code,
+            price=Decimal(str(order_data.price)),
+            quantity=order_data.quantity,
+            idempotency_key=order_data.idempotency_key,
+        )
+    except IntegrityError:
+        # A concurrent request with the same key won the race
+        await db.rollback()
+        await db.refresh(account)
+        replayed = await find_replayed_order(db, account, order_data, order_type)
+        if replayed is None:
+            raise
+        return replayed, True
+    return order, False
+
 
 @router.post("/buy", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def place_buy_order(
     order_data: OrderCreate,
+    response: Response,
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Place a buy order"""
+    """Place a buy order
+
+    A retry with an idempotency key seen before returns the original order,
+    at its original fill price, with 200 instead of 201.
+    """
     # Get account
-    account = db.query(SimAccount).filter(
-        SimAccount.user_id == order_data.user_id
-    ).first()
+    account = await db.scalar(select(SimAccount).where(SimAccount.user_id == order_data.user_id))
 
     if not account:
         raise HTTPException(
@@ -32,14 +111,10 @@ async def place_buy_order(
             detail="Account not found",
         )
 
-    # Execute order
-    order = order_executor.execute_buy_order(
-        db=db,
-        account=account,
-        stock_code=order_data.stock_code,
-        price=Decimal(str(order_data.price)),
-        quantity=order_data.quantity,
-    )
+    # Execute order (replays the original fill when the idempotency key was seen before)
+    order, replayed = await execute_idempotent(db, account, order_data, "buy", order_executor.execute_buy_order)
+    if replayed:
+        response.status_code = status.HTTP_200_OK
 
     return order
 
@@ -47,14 +122,17 @@ async def place_buy_order(
 @router.post("/sell", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def place_sell_order(
     order_data: OrderCreate,
+    response: Response,
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Place a sell order"""
+    """Place a sell order
+
+    A retry with an idempotency key seen before returns the original order,
+    at its original fill price, with 200 instead of 201.
+    """
     # Get account
-    account = db.query(SimAccount).filter(
-        SimAccount.user_id == order_data.user_id
-    ).first()
+    account = await db.scalar(select(SimAccount).where(SimAccount.user_id == order_data.user_id))
 
     if not account:
         raise HTTPException(
@@ -62,26 +140,53 @@ async def place_sell_order(
             detail="Account not found",
         )
 
-    # Execute order
-    order = order_executor.execute_sell_order(
-        db=db,
-        account=account,
-        stock_code=order_data.stock_code,
-        price=Decimal(str(order_data.price)),
-        quantity=order_data.quantity,
-    )
+    # Execute order (replays the original fill when the idempotency key was seen before)
+    order, replayed = await execute_idempotent(db, account, order_data, "sell", order_executor.execute_sell_order)
+    if replayed:
+        response.status_code = status.HTTP_200_OK
 
     return order
 
 
+@router.post("/batch", response_model=List[BatchOrderResult])
+async def place_batch_orders(
+    batch: BatchOrderRequest,
+    api_key_valid: bool = Depends(verify_api_key),
+    db: AsyncSession = Depends(get_db),
+):
+    """Place many buy/sell orders, across accounts, in a single transaction
+
+    Orders are applied in request order and each gets its own result; a
+    rejected order (unknown account, insufficient funds or stock, reused
+    idempotency key) does not affect the others. A replayed order carries
+    its original fill price, which may differ from the one requested.
+    """
+    try:
+        outcomes = await order_executor.execute_batch(db, batch.orders)
+    except IntegrityError:
+        # A concurrent request used one of the idempotency keys first; rerun to replay it
+        await db.rollback()
+        outcomes = await order_executor.execute_batch(db, batch.orders)
+
+    return [
+        BatchOrderResult(
+            status=outcome.status,
+            status_code=outcome.status_code,
+            order=OrderResponse.model_validate(outcome.order) if outcome.order is not None else None,
+            error=outcome.error,
+        )
+        for outcome in outcomes
+    ]
+
+
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: UUID,
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get order details"""
-    order = db.query(SimOrder).filter(SimOrder.id == order_id).first()
+    order = await db.get(SimOrder, order_id)
 
     if not order:
         raise HTTPException(
@@ -92,16 +197,102 @@ async def get_order(
     return order
 
 
+def order_history_filters(
+    account: SimAccount,
+    stock_code: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    cursor: Optional[UUID],
+) -> list:
+    """WHERE clauses of an account's order history, newest first from cursor (exclusive)
+
+    Every combination is served by idx_account_executed or
+    idx_account_stock_executed.
+    """
+    filters = [SimOrder.account_id == account.id]
+    if stock_code:
+        filters.append(SimOrder.stock_code == stock_code)
+    if start:
+        filters.append(SimOrder.executed_at >= start)
+    if end:
+        filters.append(SimOrder.executed_at < end)
+
+    if cursor is not None:
+        # Compare against the stored timestamp, not a round-tripped one
+        cursor_executed_at = (
+            select(SimOrder.executed_at)
+            .where(SimOrder.id == cursor, SimOrder.account_id == account.id)
+            .scalar_subquery()
+        )
+        filters.append(or_(
+            SimOrder.executed_at < cursor_executed_at,
+            and_(SimOrder.executed_at == cursor_executed_at, SimOrder.id < cursor),
+        ))
+    return filters
+
+
+def export_value(value):
+    """JSON-safe value; decimals stay strings like in OrderResponse"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def format_export_rows(rows, export_format: str) -> str:
+    """Render order rows as NDJSON lines or CSV records"""
+    if export_format == "ndjson":
+        return "".join(
+            json.dumps({column: export_value(value) for column, value in zip(EXPORT_COLUMNS, row)}) + "\n"
+            for row in rows
+        )
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [export_value(value) for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+
+async def export_orders(filters: list, export_format: str) -> AsyncIterator[str]:
+    """Stream every matching order in chunks, on a session of its own that lives as long as the response"""
+    if export_format == "csv":
+        yield ",".join(EXPORT_COLUMNS) + "\r\n"
+
+    query = (
+        select(*(getattr(SimOrder, column) for column in EXPORT_COLUMNS))
+        .where(*filters)
+        .order_by(SimOrder.executed_at.desc(), SimOrder.id.desc())
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    async with SessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield format_export_rows(rows, export_format)
+
+
 @router.get("/account/{user_id}", response_model=List[OrderResponse])
 async def get_account_orders(
     user_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[UUID] = Query(None, description="X-Next-Cursor of the previous page"),
+    stock_code: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="Executed at or after"),
+    end: Optional[datetime] = Query(None, description="Executed before"),
+    format: str = Query("json", pattern="^(json|ndjson|csv)$"),
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Get all orders for an account"""
-    account = db.query(SimAccount).filter(
-        SimAccount.user_id == user_id
-    ).first()
+    """Get an account's orders, newest first
+
+    JSON pages are keyset-paginated on (executed_at, id): when more orders
+    follow, the X-Next-Cursor header carries the cursor for the next page.
+    format=ndjson or csv streams every matching order instead (from cursor,
+    if given), ignoring limit.
+    """
+    account = await db.scalar(select(SimAccount).where(SimAccount.user_id == user_id))
 
     if not account:
         raise HTTPException(
@@ -109,8 +300,24 @@ async def get_account_orders(
             detail="Account not found",
         )
 
-    orders = db.query(SimOrder).filter(
-        SimOrder.account_id == account.id
-    ).order_by(SimOrder.executed_at.desc()).all()
+    filters = order_history_filters(account, stock_code, start, end, cursor)
+
+    if format != "json":
+        return StreamingResponse(
+            export_orders(filters, format),
+            media_type="application/x-ndjson" if format == "ndjson" else "text/csv",
+            headers={"Content-Disposition": f'attachment; filename="orders-{user_id}.{format}"'},
+        )
+
+    orders = (await db.scalars(
+        select(SimOrder)
+        .where(*filters)
+        .order_by(SimOrder.executed_at.desc(), SimOrder.id.desc())
+        .limit(limit + 1)
+    )).all()
+
+    if len(orders) > limit:
+        orders = orders[:limit]
+        response.headers["X-Next-Cursor"] = str(orders[-1].id)
 
     return orders
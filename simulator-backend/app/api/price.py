@@ -1,34 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+import asyncio
+import json
 
 from app.database import get_db
 from app.dependencies import verify_api_key
-from app.schemas.price import PriceResponse, PriceHistoryResponse
+from app.schemas.price import PriceResponse, PriceHistoryResponse, PricePathResponse
 from app.models.price_history import SimPriceHistory
 from app.engine.price_simulator import price_simulator
+from app.engine.price_broadcaster import price_broadcaster
 
 router = APIRouter(prefix="/price", tags=["price"])
 
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+def parse_stock_codes(codes: Optional[str]) -> List[str]:
+    """Split a comma-separated codes parameter, dropping blanks and duplicates"""
+    if not codes:
+        return []
+    return list(dict.fromkeys(code.strip() for code in codes.split(",") if code.strip()))
+
+
+def format_price_event(prices, timestamp: datetime) -> str:
+    """Format one price tick as a server-sent event"""
+    data = {
+        "timestamp": timestamp.isoformat(),
+        "prices": [
+            {"stock_code": stock_code, "price": str(price)}
+            for stock_code, price in prices.items()
+        ],
+    }
+    return f"event: prices\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("", response_model=List[PriceResponse])
+async def get_current_prices(
+    codes: str = Query(..., description="Comma-separated stock codes"),
+    api_key_valid: bool = Depends(verify_api_key),
+):
+    """Get current prices for several stocks in one request"""
+    stock_codes = parse_stock_codes(codes)
+
+    if not stock_codes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one stock code is required",
+        )
+
+    timestamp = datetime.utcnow()
+    prices = price_simulator.get_prices(stock_codes)
+    return [
+        PriceResponse(
+            stock_code=stock_code,
+            price=price,
+            timestamp=timestamp,
+        )
+        for stock_code, price in prices.items()
+    ]
+
+
+@router.get("/stream")
+async def stream_prices(
+    codes: Optional[str] = Query(None, description="Comma-separated stock codes, all codes if omitted"),
+    api_key_valid: bool = Depends(verify_api_key),
+):
+    """Stream every price update as server-sent events"""
+    stock_codes = parse_stock_codes(codes)
+
+    async def event_stream():
+        queue = price_broadcaster.subscribe()
+        try:
+            # Initial snapshot, which also starts tracking the requested codes
+            if stock_codes:
+                snapshot = price_simulator.get_prices(stock_codes)
+                yield format_price_event(snapshot, datetime.utcnow())
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                prices = message["prices"]
+                if stock_codes:
+                    prices = {code: prices[code] for code in stock_codes if code in prices}
+                if prices:
+                    yield format_price_event(prices, message["timestamp"])
+        finally:
+            price_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.get("/{stock_code}", response_model=PriceResponse)
 async def get_current_price(
     stock_code: str,
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
 ):
-    """Get current price for a stock"""
+    """Get current price for a stock (in-memory read; history is recorded by the price updater)"""
     price = price_simulator.get_price(stock_code)
 
-    # Save to history
-    history = SimPriceHistory(
-        stock_code=stock_code,
-        price=price,
-    )
-    db.add(history)
-    db.commit()
-
     return PriceResponse(
         stock_code=stock_code,
         price=price,
@@ -41,11 +122,32 @@ async def get_price_history(
     stock_code: str,
     limit: int = 100,
     api_key_valid: bool = Depends(verify_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get price history for a stock"""
-    history = db.query(SimPriceHistory).filter(
-        SimPriceHistory.stock_code == stock_code
-    ).order_by(SimPriceHistory.timestamp.desc()).limit(limit).all()
+    history = (await db.scalars(
+        select(SimPriceHistory)
+        .where(SimPriceHistory.stock_code == stock_code)
+        .order_by(SimPriceHistory.timestamp.desc())
+        .limit(limit)
+    )).all()
 
     return history
+
+
+@router.get("/{stock_code}/paths", response_model=PricePathResponse)
+async def generate_price_path(
+    stock_code: str,
+    steps: int = Query(1000, ge=1, le=100000),
+    seed: Optional[int] = None,
+    api_key_valid: bool = Depends(verify_api_key),
+):
+    """Generate a reproducible price path from the current price with the active price model"""
+    seed = price_simulator.seed if seed is None else seed
+    paths = price_simulator.generate_paths([stock_code], steps, seed=seed)
+
+    return PricePathResponse(
+        stock_code=stock_code,
+        seed=seed,
+        prices=paths[:, 0].tolist(),
+    )
@@ -1,10 +1,24 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./simulator.db"
 
+    # Connection pool (per process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; reconnect before server-side idle timeouts
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite pragmas, applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"  # readers no longer block on the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # fsync at checkpoints only; safe with WAL
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes (256 MiB)
+
     # API Security
     API_KEY: str = "dev-api-key"
 
@@ -13,6 +27,20 @@ class Settings(BaseSettings):
     PRICE_UPDATE_INTERVAL: int = 5
     DEFAULT_VOLATILITY: float = 3.0
 
+    # Price model: random_walk, gbm, jump_diffusion, replay (from sim_price_history)
+    PRICE_MODEL: str = "random_walk"
+    PRICE_SEED: Optional[int] = None  # set for reproducible price paths
+    PRICE_SEED_PER_TICKER: bool = False  # one Generator per ticker, independent of other tickers
+    PRICE_DRIFT: float = 0.0  # % per update (gbm, jump_diffusion)
+    PRICE_JUMP_INTENSITY: float = 0.01  # expected jumps per update (jump_diffusion)
+    PRICE_JUMP_MEAN: float = -2.0  # % mean log jump size (jump_diffusion)
+    PRICE_JUMP_VOLATILITY: float = 5.0  # % log jump size std (jump_diffusion)
+
+    # Price history (buffered, written with bulk inserts)
+    PRICE_HISTORY_BATCH_SIZE: int = 1000
+    PRICE_HISTORY_FLUSH_SECONDS: float = 10.0
+    PRICE_HISTORY_MAX_BUFFERED: int = 100000  # rows kept for retry while the database is unavailable
+
     # Server
     PORT: int = 8001
 
@@ -1,6 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from dataclasses import dataclass
 from decimal import Decimal
 from fastapi import HTTPException, status
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
 from uuid import UUID
 
 from app.models.account import SimAccount
@@ -8,18 +11,41 @@ from app.models.order import SimOrder
 from app.models.stock import SimStock
 
 
+class BatchOrder(Protocol):
+    """One order of a batch (BatchOrderItem satisfies this)"""
+
+    user_id: str
+    order_type: str
+    stock_code: str
+    price: float
+    quantity: int
+    idempotency_key: Optional[str]
+
+
+@dataclass
+class BatchOrderOutcome:
+    """Result of one order of a batch: the filled (or replayed) order, or why it was rejected"""
+
+    status: str  # filled, replayed, rejected
+    order: Optional[SimOrder] = None
+    status_code: int = status.HTTP_201_CREATED
+    error: Optional[str] = None
+
+
 class OrderExecutor:
     """Executes buy and sell orders instantly (simulation)"""
 
     @staticmethod
-    def execute_buy_order(
-        db: Session,
+    def _apply_buy(
+        db: AsyncSession,
         account: SimAccount,
+        stock: Optional[SimStock],
         stock_code: str,
         price: Decimal,
         quantity: int,
-    ) -> SimOrder:
-        """Execute a buy order"""
+        idempotency_key: Optional[str] = None,
+    ) -> Tuple[SimOrder, SimStock]:
+        """Apply a buy to the account and its holding without committing"""
         total_cost = price * quantity
 
         # Check if account has enough cash
@@ -33,11 +59,6 @@ class OrderExecutor:
         account.cash -= total_cost
 
         # Update stock holdings
-        stock = db.query(SimStock).filter(
-            SimStock.account_id == account.id,
-            SimStock.stock_code == stock_code,
-        ).first()
-
         if stock:
             # Update existing holding
             total_quantity = stock.quantity + quantity
@@ -62,28 +83,26 @@ class OrderExecutor:
             price=price,
             quantity=quantity,
             status="filled",
+            idempotency_key=idempotency_key,
         )
         db.add(order)
-
-        db.commit()
-        db.refresh(order)
-        return order
+        return order, stock
 
     @staticmethod
-    def execute_sell_order(
-        db: Session,
+    def _apply_sell(
+        db: AsyncSession,
         account: SimAccount,
+        stock: Optional[SimStock],
         stock_code: str,
         price: Decimal,
         quantity: int,
+        idempotency_key: Optional[str] = None,
     ) -> SimOrder:
-        """Execute a sell order"""
-        # Check if account has enough stock
-        stock = db.query(SimStock).filter(
-            SimStock.account_id == account.id,
-            SimStock.stock_code == stock_code,
-        ).first()
+        """Apply a sell to the account and its holding without committing
 
+        An emptied holding is left at quantity 0 for the caller to delete.
+        """
+        # Check if account has enough stock
         if not stock or stock.quantity < quantity:
             available = stock.quantity if stock else 0
             raise HTTPException(
@@ -98,10 +117,6 @@ class OrderExecutor:
         # Update stock holdings
         stock.quantity -= quantity
 
-        if stock.quantity == 0:
-            # Remove stock if all sold
-            db.delete(stock)
-
         # Create order record
         order = SimOrder(
             account_id=account.id,
@@ -110,13 +125,160 @@ class OrderExecutor:
             price=price,
             quantity=quantity,
             status="filled",
+            idempotency_key=idempotency_key,
         )
         db.add(order)
+        return order
+
+    @staticmethod
+    async def _get_stock(db: AsyncSession, account: SimAccount, stock_code: str) -> Optional[SimStock]:
+        return await db.scalar(select(SimStock).where(
+            SimStock.account_id == account.id,
+            SimStock.stock_code == stock_code,
+        ))
+
+    async def execute_buy_order(
+        self,
+        db: AsyncSession,
+        account: SimAccount,
+        stock_code: str,
+        price: Decimal,
+        quantity: int,
+        idempotency_key: Optional[str] = None,
+    ) -> SimOrder:
+        """Execute a buy order"""
+        stock = await self._get_stock(db, account, stock_code)
+        order, _ = self._apply_buy(db, account, stock, stock_code, price, quantity, idempotency_key)
+
+        await db.commit()
+        await db.refresh(order)
+        return order
+
+    async def execute_sell_order(
+        self,
+        db: AsyncSession,
+        account: SimAccount,
+        stock_code: str,
+        price: Decimal,
+        quantity: int,
+        idempotency_key: Optional[str] = None,
+    ) -> SimOrder:
+        """Execute a sell order"""
+        stock = await self._get_stock(db, account, stock_code)
+        order = self._apply_sell(db, account, stock, stock_code, price, quantity, idempotency_key)
+
+        if stock.quantity == 0:
+            # Remove stock if all sold
+            await db.delete(stock)
 
-        db.commit()
-        db.refresh(order)
+        await db.commit()
+        await db.refresh(order)
         return order
 
+    async def execute_batch(self, db: AsyncSession, orders: Sequence[BatchOrder]) -> List[BatchOrderOutcome]:
+        """Execute many buy/sell orders, across accounts, in one transaction
+
+        Accounts, holdings and previously used idempotency keys are loaded
+        with one query each, orders are applied in request order against that
+        in-memory state, and everything is committed once. An order that
+        fails its checks is rejected on its own without affecting the rest.
+        """
+        accounts = {
+            str(account.user_id): account
+            for account in await db.scalars(select(SimAccount).where(
+                SimAccount.user_id.in_({UUID(order.user_id) for order in orders if _is_uuid(order.user_id)})
+            ))
+        }
+        account_ids = [account.id for account in accounts.values()]
+
+        stocks: Dict[Tuple[UUID, str], SimStock] = {
+            (stock.account_id, stock.stock_code): stock
+            for stock in await db.scalars(select(SimStock).where(SimStock.account_id.in_(account_ids)))
+        }
+
+        keys = {order.idempotency_key for order in orders if order.idempotency_key}
+        executed: Dict[Tuple[UUID, str], SimOrder] = {}
+        if keys:
+            executed = {
+                (order.account_id, order.idempotency_key): order
+                for order in await db.scalars(select(SimOrder).where(
+                    SimOrder.account_id.in_(account_ids),
+                    SimOrder.idempotency_key.in_(keys),
+                ))
+            }
+
+        outcomes: List[BatchOrderOutcome] = []
+        for item in orders:
+            account = accounts.get(str(UUID(item.user_id))) if _is_uuid(item.user_id) else None
+            if account is None:
+                outcomes.append(BatchOrderOutcome(
+                    status="rejected", status_code=status.HTTP_404_NOT_FOUND, error="Account not found",
+                ))
+                continue
+
+            # Replay orders whose idempotency key was seen before (or earlier in this batch),
+            # at their original fill price: a retry may be sent at a newer price
+            if item.idempotency_key:
+                replayed = executed.get((account.id, item.idempotency_key))
+                if replayed is not None:
+                    if (replayed.order_type != item.order_type or replayed.stock_code != item.stock_code
+                            or replayed.quantity != item.quantity):
+                        outcomes.append(BatchOrderOutcome(
+                            status="rejected",
+                            status_code=status.HTTP_409_CONFLICT,
+                            error="Idempotency key was already used for a different order",
+                        ))
+                    else:
+                        outcomes.append(BatchOrderOutcome(status="replayed", order=replayed, status_code=status.HTTP_200_OK))
+                    continue
+
+            price = Decimal(str(item.price))
+            stock = stocks.get((account.id, item.stock_code))
+            try:
+                if item.order_type == "buy":
+                    order, stock = self._apply_buy(
+                        db, account, stock, item.stock_code, price, item.quantity, item.idempotency_key,
+                    )
+                    stocks[(account.id, item.stock_code)] = stock
+                else:
+                    order = self._apply_sell(
+                        db, account, stock, item.stock_code, price, item.quantity, item.idempotency_key,
+                    )
+            except HTTPException as e:
+                outcomes.append(BatchOrderOutcome(status="rejected", status_code=e.status_code, error=e.detail))
+                continue
+
+            if item.idempotency_key:
+                executed[(account.id, item.idempotency_key)] = order
+            outcomes.append(BatchOrderOutcome(status="filled", order=order))
+
+        # Holdings are only deleted at the end, so a later buy in the batch can reuse them
+        for stock in stocks.values():
+            if stock.quantity == 0:
+                if stock in db.new:
+                    db.expunge(stock)
+                else:
+                    await db.delete(stock)
+
+        await db.commit()
+
+        # Load server-side defaults (executed_at) of every filled order in one query
+        filled_ids = [outcome.order.id for outcome in outcomes if outcome.status == "filled"]
+        if filled_ids:
+            await db.scalars(
+                select(SimOrder).where(SimOrder.id.in_(filled_ids)).execution_options(populate_existing=True)
+            )
+
+        return outcomes
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        UUID(value)
+    except (ValueError, TypeError):
+        return False
+    return True
+
 
 # Singleton instance
 order_executor = OrderExecutor()
@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Set
+
+
+class PriceBroadcaster:
+    """Fans out price updates to streaming subscribers
+
+    Prices are published by the price updater job and delivered to an
+    asyncio queue per subscriber, all on the application's event loop. A
+    slow subscriber only ever misses intermediate ticks, never the latest one.
+    """
+
+    def __init__(self, queue_size: int = 16):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber queue"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Remove a subscriber queue"""
+        self._subscribers.discard(queue)
+
+    def publish(self, prices: Dict[str, float], timestamp: datetime):
+        """Publish one price tick to every subscriber"""
+        message = {"timestamp": timestamp, "prices": prices}
+        for queue in self._subscribers:
+            self._offer(queue, message)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: Dict[str, Any]):
+        if queue.full():
+            queue.get_nowait()  # Drop the oldest tick
+        queue.put_nowait(message)
+
+
+# Singleton instance
+price_broadcaster = PriceBroadcaster()
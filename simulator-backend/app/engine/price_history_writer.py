@@ -0,0 +1,78 @@
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.price_history import SimPriceHistory
+
+logger = logging.getLogger(__name__)
+
+
+class PriceHistoryWriter:
+    """Buffers price history rows and writes them with bulk inserts
+
+    Rows are flushed once the buffer reaches max_batch_size or when
+    flush_interval seconds have passed since the last flush. Rows of a
+    failed flush go back to the buffer and are retried with the next one;
+    while the database stays unavailable, only the newest max_buffered rows
+    are kept.
+
+    Only the price updater's jobs touch the buffer, and they all run on the
+    application's event loop, so it needs no lock.
+    """
+
+    def __init__(self, max_batch_size: int, flush_interval: float, max_buffered: int):
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+
+    async def record(self, prices: Dict[str, float], timestamp: datetime):
+        """Buffer one price update tick"""
+        self._buffer.extend(
+            {"stock_code": stock_code, "price": price, "timestamp": timestamp}
+            for stock_code, price in prices.items()
+        )
+        if (
+            len(self._buffer) >= self.max_batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self):
+        """Write all buffered rows in one bulk insert"""
+        rows, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+
+        if not rows:
+            return
+
+        async with SessionLocal() as db:
+            try:
+                await db.execute(insert(SimPriceHistory), rows)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                self._requeue(rows)
+                logger.error(f"Failed to write {len(rows)} price history rows, {len(self._buffer)} buffered: {str(e)}")
+
+    def _requeue(self, rows: List[Dict[str, Any]]):
+        """Put the rows of a failed flush back ahead of the ones recorded since"""
+        self._buffer[:0] = rows
+        overflow = len(self._buffer) - self.max_buffered
+        if overflow > 0:
+            del self._buffer[:overflow]
+            logger.warning(f"Price history buffer full, dropped the {overflow} oldest rows")
+
+
+# Singleton instance
+price_history_writer = PriceHistoryWriter(
+    max_batch_size=settings.PRICE_HISTORY_BATCH_SIZE,
+    flush_interval=settings.PRICE_HISTORY_FLUSH_SECONDS,
+    max_buffered=settings.PRICE_HISTORY_MAX_BUFFERED,
+)
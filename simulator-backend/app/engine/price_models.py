@@ -0,0 +1,179 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.price_history import SimPriceHistory
+
+
+class TickerRandom:
+    """Generator-like adapter that draws each ticker's variates from its own Generator
+
+    Per-ticker streams keep a ticker's path reproducible no matter which
+    other tickers are being simulated alongside it.
+    """
+
+    def __init__(self, generators: Sequence[np.random.Generator]):
+        self.generators = generators
+
+    def standard_normal(self, size: int) -> np.ndarray:
+        return np.array([generator.standard_normal() for generator in self.generators[:size]])
+
+    def poisson(self, lam: float, size: int) -> np.ndarray:
+        return np.array([generator.poisson(lam) for generator in self.generators[:size]])
+
+
+RandomSource = Union[np.random.Generator, TickerRandom]
+
+
+def ticker_generator(seed: int, stock_code: str) -> np.random.Generator:
+    """Seeded Generator for one ticker, stable across runs and processes"""
+    return np.random.default_rng([seed, zlib.crc32(stock_code.encode())])
+
+
+class PriceModel(ABC):
+    """Stochastic model that advances an array of prices by one step"""
+
+    @abstractmethod
+    def step(self, codes: List[str], prices: np.ndarray, rng: RandomSource) -> np.ndarray:
+        """Return the next price for every ticker"""
+
+    def paths(self, codes: List[str], initial_prices: np.ndarray, n_steps: int, rng: RandomSource) -> np.ndarray:
+        """Generate n_steps prices per ticker, shape (n_steps + 1, len(codes))"""
+        paths = np.empty((n_steps + 1, len(codes)), dtype=np.float64)
+        paths[0] = initial_prices
+        for i in range(1, n_steps + 1):
+            paths[i] = self.step(codes, paths[i - 1], rng)
+        return paths
+
+
+class RandomWalkModel(PriceModel):
+    """Normal per-step returns: price * (1 + volatility * Z)"""
+
+    def __init__(self, volatility: float):
+        self.volatility = volatility
+
+    def step(self, codes, prices, rng):
+        return prices * (1 + self.volatility * rng.standard_normal(len(prices)))
+
+
+class GBMModel(PriceModel):
+    """Geometric Brownian motion with per-step drift and volatility"""
+
+    def __init__(self, volatility: float, drift: float = 0.0):
+        self.volatility = volatility
+        self.drift = drift
+
+    def _log_returns(self, shocks: np.ndarray) -> np.ndarray:
+        return (self.drift - 0.5 * self.volatility ** 2) + self.volatility * shocks
+
+    def step(self, codes, prices, rng):
+        return prices * np.exp(self._log_returns(rng.standard_normal(len(prices))))
+
+    def paths(self, codes, initial_prices, n_steps, rng):
+        if isinstance(rng, TickerRandom):
+            return super().paths(codes, initial_prices, n_steps, rng)
+
+        # Every step drawn at once; same variates as n_steps successive step() calls
+        log_returns = self._log_returns(rng.standard_normal((n_steps, len(codes))))
+        paths = np.empty((n_steps + 1, len(codes)), dtype=np.float64)
+        paths[0] = initial_prices
+        paths[1:] = initial_prices * np.exp(np.cumsum(log_returns, axis=0))
+        return paths
+
+
+class JumpDiffusionModel(GBMModel):
+    """Merton jump diffusion: GBM plus Poisson jumps with normal log jump sizes"""
+
+    def __init__(
+        self,
+        volatility: float,
+        drift: float = 0.0,
+        jump_intensity: float = 0.01,
+        jump_mean: float = -0.02,
+        jump_volatility: float = 0.05,
+    ):
+        super().__init__(volatility, drift)
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_volatility = jump_volatility
+
+    def step(self, codes, prices, rng):
+        count = len(prices)
+        log_returns = self._log_returns(rng.standard_normal(count))
+
+        # Sum of k normal jumps ~ N(k * mean, sqrt(k) * volatility)
+        jumps = rng.poisson(self.jump_intensity, count)
+        log_returns += jumps * self.jump_mean + np.sqrt(jumps) * self.jump_volatility * rng.standard_normal(count)
+        return prices * np.exp(log_returns)
+
+    def paths(self, codes, initial_prices, n_steps, rng):
+        return PriceModel.paths(self, codes, initial_prices, n_steps, rng)
+
+
+class ReplayModel(PriceModel):
+    """Replays stored price series; a ticker holds its last price once its series ends
+
+    Tickers without a stored series keep their current price.
+    """
+
+    def __init__(self, series: Dict[str, Sequence[float]]):
+        self.series = {code: np.asarray(values, dtype=np.float64) for code, values in series.items()}
+        self._positions: Dict[str, int] = {code: 0 for code in self.series}
+
+    @classmethod
+    async def from_history(cls, db: AsyncSession, stock_codes: Optional[List[str]] = None) -> "ReplayModel":
+        """Load series from sim_price_history in timestamp order"""
+        query = select(SimPriceHistory.stock_code, SimPriceHistory.price)
+        if stock_codes:
+            query = query.where(SimPriceHistory.stock_code.in_(stock_codes))
+
+        series: Dict[str, List[float]] = {}
+        for stock_code, price in await db.execute(query.order_by(SimPriceHistory.timestamp)):
+            series.setdefault(stock_code, []).append(float(price))
+        return cls(series)
+
+    def step(self, codes, prices, rng):
+        next_prices = prices.copy()
+        for i, code in enumerate(codes):
+            values = self.series.get(code)
+            if values is None or len(values) == 0:
+                continue
+            position = min(self._positions[code], len(values) - 1)
+            next_prices[i] = values[position]
+            self._positions[code] = position + 1
+        return next_prices
+
+    def paths(self, codes, initial_prices, n_steps, rng):
+        # Generating paths must not advance the live replay
+        positions = dict(self._positions)
+        try:
+            return super().paths(codes, initial_prices, n_steps, rng)
+        finally:
+            self._positions = positions
+
+
+def create_price_model(name: str) -> PriceModel:
+    """Build the price model selected by PRICE_MODEL (replay is loaded at startup)"""
+    volatility = settings.DEFAULT_VOLATILITY / 100.0
+    drift = settings.PRICE_DRIFT / 100.0
+
+    if name == "random_walk":
+        return RandomWalkModel(volatility)
+    if name == "gbm":
+        return GBMModel(volatility, drift)
+    if name == "jump_diffusion":
+        return JumpDiffusionModel(
+            volatility,
+            drift,
+            jump_intensity=settings.PRICE_JUMP_INTENSITY,
+            jump_mean=settings.PRICE_JUMP_MEAN / 100.0,
+            jump_volatility=settings.PRICE_JUMP_VOLATILITY / 100.0,
+        )
+    if name == "replay":
+        return ReplayModel({})
+    raise ValueError(f"Unknown price model: {name}")
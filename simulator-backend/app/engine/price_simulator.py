@@ -1,51 +1,176 @@
 import numpy as np
 from decimal import Decimal
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from app.config import settings
-import random
+from app.engine.price_models import PriceModel, RandomSource, TickerRandom, create_price_model, ticker_generator
 
 
 class PriceSimulator:
-    """Simulates stock prices using random walk"""
+    """Simulates stock prices with a pluggable stochastic model
 
-    def __init__(self):
-        self.prices: Dict[str, Decimal] = {}  # stock_code -> current_price
-        self.volatility = settings.DEFAULT_VOLATILITY / 100.0  # Convert to decimal
+    Prices are kept in one contiguous float64 array with a code -> index map,
+    so a tick updates every ticker with a single vectorized draw. Decimal
+    conversion only happens at the API boundary. The price updater job and
+    the API routes all run on the application's event loop, so the state
+    needs no locking.
+
+    Randomness comes from a seeded numpy Generator owned by the simulator, or
+    from one Generator per ticker when per_ticker_seed is set, so runs with
+    the same seed reproduce the same price paths.
+    """
+
+    MIN_PRICE = 1000.0
+
+    def __init__(
+        self,
+        model: Optional[PriceModel] = None,
+        seed: Optional[int] = None,
+        per_ticker_seed: bool = False,
+        initial_capacity: int = 1024,
+    ):
+        self._index: Dict[str, int] = {}  # stock_code -> position in _prices
+        self._codes: List[str] = []
+        self._prices = np.empty(initial_capacity, dtype=np.float64)
+        self.model = model or create_price_model(settings.PRICE_MODEL)
+        self.per_ticker_seed = per_ticker_seed
+        self.reseed(seed)
+
+    def reseed(self, seed: Optional[int] = None):
+        """Reset the random state; an unseeded simulator draws fresh entropy"""
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % (2 ** 63))
+        self._rng = np.random.default_rng(self.seed)
+        self._generators = [ticker_generator(self.seed, code) for code in self._codes]
+
+    def set_model(self, model: PriceModel):
+        """Swap the stochastic model used for subsequent updates"""
+        self.model = model
+
+    def _random_source(self, start: int = 0, stop: Optional[int] = None) -> RandomSource:
+        if self.per_ticker_seed:
+            return TickerRandom(self._generators[start:stop])
+        return self._rng
+
+    @staticmethod
+    def _to_decimal(price: float) -> Decimal:
+        return Decimal(str(price))
+
+    def _register(self, stock_code: str, price: float) -> int:
+        """Add a ticker to the price array, growing it when full"""
+        index = len(self._codes)
+        if index == len(self._prices):
+            grown = np.empty(max(1, len(self._prices) * 2), dtype=np.float64)
+            grown[:index] = self._prices[:index]
+            self._prices = grown
+
+        self._prices[index] = price
+        self._index[stock_code] = index
+        self._codes.append(stock_code)
+        self._generators.append(ticker_generator(self.seed, stock_code))
+        return index
+
+    def _get_or_register(self, stock_code: str, initial_price: Optional[Decimal] = None) -> int:
+        index = self._index.get(stock_code)
+        if index is None:
+            # Without an initial price, start where generate_paths starts the untracked code
+            price = float(initial_price) if initial_price else self._untracked_price(stock_code)
+            index = self._register(stock_code, price)
+        return index
+
+    def _untracked_price(self, stock_code: str) -> float:
+        """Seeded starting price of a code between 50,000 and 100,000, from its own ticker seed
+
+        Drawn without advancing the live random state, so registering a code
+        and generating paths for it agree on where it starts.
+        """
+        return float(ticker_generator(self.seed, stock_code).integers(50000, 100000, endpoint=True))
+
+    @property
+    def stock_codes(self) -> List[str]:
+        """All tracked stock codes"""
+        return list(self._codes)
+
+    @property
+    def prices(self) -> Dict[str, Decimal]:
+        """Snapshot of all tracked prices (stock_code -> current_price)"""
+        return {
+            code: self._to_decimal(price)
+            for code, price in zip(self._codes, self._prices[:len(self._codes)].tolist())
+        }
 
     def get_or_initialize_price(self, stock_code: str, initial_price: Optional[Decimal] = None) -> Decimal:
         """Get current price or initialize with random price"""
-        if stock_code not in self.prices:
-            if initial_price:
-                self.prices[stock_code] = Decimal(str(initial_price))
-            else:
-                # Initialize with random price between 50,000 and 100,000
-                self.prices[stock_code] = Decimal(str(random.randint(50000, 100000)))
+        index = self._get_or_register(stock_code, initial_price)
+        return self._to_decimal(float(self._prices[index]))
 
-        return self.prices[stock_code]
+    def _finalize(self, prices: np.ndarray) -> np.ndarray:
+        # Ensure price doesn't go below 1000, keep two decimal places
+        np.maximum(prices, self.MIN_PRICE, out=prices)
+        return np.round(prices, 2, out=prices)
+
+    def update_all_prices(self) -> Tuple[List[str], np.ndarray]:
+        """Advance every tracked price one model step in a single vectorized draw
+
+        Returns the tracked codes and a copy of their new prices.
+        """
+        count = len(self._codes)
+        prices = self._prices[:count]
+        prices[:] = self.model.step(self._codes, prices, self._random_source(0, count))
+        self._finalize(prices)
+        return list(self._codes), prices.copy()
 
     def update_price(self, stock_code: str) -> Decimal:
-        """Update price using random walk"""
-        current_price = self.get_or_initialize_price(stock_code)
+        """Advance the price of a single stock one model step"""
+        index = self._get_or_register(stock_code)
+        prices = self._prices[index:index + 1]
+        prices[:] = self.model.step([stock_code], prices, self._random_source(index, index + 1))
+        self._finalize(prices)
+        return self._to_decimal(float(prices[0]))
 
-        # Random walk: price change = current_price * volatility * random_normal
-        change_pct = np.random.normal(0, self.volatility)
-        new_price = float(current_price) * (1 + change_pct)
+    def generate_paths(self, stock_codes: List[str], n_steps: int, seed: Optional[int] = None) -> np.ndarray:
+        """Generate price paths in bulk from the current prices without touching live state
 
-        # Ensure price doesn't go below 1000
-        new_price = max(new_price, 1000)
+        Returns an array of shape (n_steps + 1, len(stock_codes)). The same
+        seed always yields the same paths. Untracked codes start from the
+        price their ticker seed gives them and are not registered.
+        """
+        initial_prices = np.array([
+            self._prices[self._index[stock_code]] if stock_code in self._index else self._untracked_price(stock_code)
+            for stock_code in stock_codes
+        ], dtype=np.float64)
 
-        self.prices[stock_code] = Decimal(str(round(new_price, 2)))
-        return self.prices[stock_code]
+        seed = self.seed if seed is None else seed
+        if self.per_ticker_seed:
+            rng: RandomSource = TickerRandom([ticker_generator(seed, code) for code in stock_codes])
+        else:
+            rng = np.random.default_rng(seed)
+
+        paths = self.model.paths(stock_codes, initial_prices, n_steps, rng)
+        return self._finalize(paths)
 
     def set_price(self, stock_code: str, price: Decimal):
         """Manually set price for a stock"""
-        self.prices[stock_code] = price
+        index = self._index.get(stock_code)
+        if index is None:
+            self._register(stock_code, float(price))
+        else:
+            self._prices[index] = float(price)
 
     def get_price(self, stock_code: str) -> Decimal:
         """Get current price without updating"""
         return self.get_or_initialize_price(stock_code)
 
+    def get_prices(self, stock_codes: List[str]) -> Dict[str, Decimal]:
+        """Get current prices for several stocks without updating"""
+        indexes = [self._get_or_register(stock_code) for stock_code in stock_codes]
+        return {
+            stock_code: self._to_decimal(price)
+            for stock_code, price in zip(stock_codes, self._prices[indexes].tolist())
+        }
+
 
 # Singleton instance
-price_simulator = PriceSimulator()
+price_simulator = PriceSimulator(
+    seed=settings.PRICE_SEED,
+    per_ticker_seed=settings.PRICE_SEED_PER_TICKER,
+)
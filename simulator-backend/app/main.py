@@ -1,12 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import price, order, account
-from app.database import engine, Base
+from app.database import close_db, init_db
 from app.workers.price_updater import start_price_updater, stop_price_updater
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="Stock Simulator API",
     description="Stock price and trading simulator",
@@ -30,14 +27,16 @@ app.include_router(account.router, prefix="/api")
 
 @app.on_event("startup")
 async def startup_event():
-    """Start background worker on startup"""
-    start_price_updater()
+    """Create tables and start background worker on startup"""
+    await init_db()
+    await start_price_updater()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop background worker on shutdown"""
-    stop_price_updater()
+    """Stop background worker and close the database connection pool on shutdown"""
+    await stop_price_updater()
+    await close_db()
 
 
 @app.get("/")
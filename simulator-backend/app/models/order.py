@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, func, Integer
+from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, func, Integer, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.guid import GUID
@@ -16,6 +16,15 @@ class SimOrder(Base):
     quantity = Column(Integer, nullable=False)
     status = Column(String(20), nullable=False, default="filled")  # filled (instant execution)
     executed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    idempotency_key = Column(String(64), nullable=True)  # client-generated, dedupes retried orders
 
     # Relationships
     account = relationship("SimAccount", back_populates="orders")
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('account_id', 'idempotency_key', name='uq_account_idempotency_key'),
+        # id breaks executed_at ties, so keyset pages are read straight off the index
+        Index("idx_account_executed", "account_id", "executed_at", "id"),
+        Index("idx_account_stock_executed", "account_id", "stock_code", "executed_at", "id"),
+    )
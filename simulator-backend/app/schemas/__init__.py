@@ -1,12 +1,16 @@
 from app.schemas.account import AccountResponse, AccountCreate
-from app.schemas.order import OrderCreate, OrderResponse
-from app.schemas.price import PriceResponse, PriceHistoryResponse
+from app.schemas.order import OrderCreate, OrderResponse, BatchOrderItem, BatchOrderRequest, BatchOrderResult
+from app.schemas.price import PriceResponse, PriceHistoryResponse, PricePathResponse
 
 __all__ = [
     "AccountResponse",
     "AccountCreate",
     "OrderCreate",
     "OrderResponse",
+    "BatchOrderItem",
+    "BatchOrderRequest",
+    "BatchOrderResult",
     "PriceResponse",
     "PriceHistoryResponse",
+    "PricePathResponse",
 ]
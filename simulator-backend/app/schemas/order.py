@@ -1,6 +1,7 @@
-from pydantic import BaseModel, UUID4
+from pydantic import BaseModel, UUID4, Field
 from datetime import datetime
 from decimal import Decimal
+from typing import List, Optional
 
 
 class OrderCreate(BaseModel):
@@ -8,6 +9,7 @@ class OrderCreate(BaseModel):
     stock_code: str
     price: float
     quantity: int
+    idempotency_key: Optional[str] = Field(None, max_length=64)
 
 
 class OrderResponse(BaseModel):
@@ -22,3 +24,18 @@ class OrderResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BatchOrderItem(OrderCreate):
+    order_type: str = Field(..., pattern="^(buy|sell)$")
+
+
+class BatchOrderRequest(BaseModel):
+    orders: List[BatchOrderItem] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchOrderResult(BaseModel):
+    status: str  # filled, replayed, rejected
+    status_code: int  # what the single-order endpoint would have returned
+    order: Optional[OrderResponse] = None
+    error: Optional[str] = None
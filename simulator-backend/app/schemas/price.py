@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from decimal import Decimal
+from typing import List
 
 
 class PriceResponse(BaseModel):
@@ -16,3 +17,9 @@ class PriceHistoryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PricePathResponse(BaseModel):
+    stock_code: str
+    seed: int
+    prices: List[float]
@@ -1,16 +1,28 @@
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from datetime import datetime
+from app.database import SessionLocal
+from app.engine.price_models import ReplayModel
 from app.engine.price_simulator import price_simulator
+from app.engine.price_broadcaster import price_broadcaster
+from app.engine.price_history_writer import price_history_writer
 from app.config import settings
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-scheduler = BackgroundScheduler()
+# Runs on the application's event loop, next to the async database sessions
+scheduler = AsyncIOScheduler()
 
 
-def start_price_updater():
+async def start_price_updater():
     """Start the price updater worker"""
+    if settings.PRICE_MODEL == "replay":
+        async with SessionLocal() as db:
+            model = await ReplayModel.from_history(db)
+        price_simulator.set_model(model)
+        logger.info(f"Replaying stored price series for {len(model.series)} stocks")
+
     scheduler.add_job(
         update_all_prices,
         'interval',
@@ -22,17 +34,27 @@ def start_price_updater():
     logger.info("Price updater worker started")
 
 
-def stop_price_updater():
+async def stop_price_updater():
     """Stop the price updater worker"""
     scheduler.shutdown()
+    await price_history_writer.flush()
     logger.info("Price updater worker stopped")
 
 
-def update_all_prices():
+async def update_all_prices():
     """Update all tracked stock prices"""
     try:
-        for stock_code in list(price_simulator.prices.keys()):
-            new_price = price_simulator.update_price(stock_code)
-            logger.debug(f"Updated {stock_code}: {new_price}")
+        stock_codes, new_prices = price_simulator.update_all_prices()
+        logger.debug(f"Updated {len(stock_codes)} prices")
+
+        if stock_codes:
+            updated = dict(zip(stock_codes, new_prices.tolist()))
+            timestamp = datetime.utcnow()
+
+            # Push the tick to streaming subscribers before any history write can hold it up
+            price_broadcaster.publish(updated, timestamp)
+
+            # Record history once per update, not per read
+            await price_history_writer.record(updated, timestamp)
     except Exception as e:
         logger.error(f"Error updating prices: {str(e)}")
@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway database first
+_db_dir = tempfile.mkdtemp(prefix="simulator-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+
+import uuid
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.database import Base, SessionLocal, engine
+from app.main import app
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """A session on freshly created tables"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with SessionLocal() as session:
+        yield session
+
+    # Pooled aiosqlite connections are tied to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(db):
+    """API client with the shared API key"""
+    async with httpx.AsyncClient(
+        app=app,
+        base_url="http://test/api",
+        headers={"X-Simulator-API-Key": settings.API_KEY},
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+async def account(client):
+    """A fresh account with the default starting cash"""
+    response = await client.post("/account/create", json={"user_id": str(uuid.uuid4())})
+    return response.json()
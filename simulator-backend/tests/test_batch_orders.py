@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def item(account, order_type, **fields):
+    return {
+        "user_id": account["user_id"],
+        "order_type": order_type,
+        "stock_code": "005930",
+        "price": 1000,
+        "quantity": 10,
+        **fields,
+    }
+
+
+async def load(client, account):
+    return (await client.get(f"/account/{account['user_id']}")).json()
+
+
+async def test_rejected_orders_do_not_affect_the_rest_of_the_batch(client, account):
+    response = await client.post("/order/batch", json={"orders": [
+        item(account, "buy", idempotency_key="a"),
+        item(account, "sell", quantity=20),
+        item(account, "buy", price=10 ** 9),
+        item({"user_id": "not-an-account"}, "buy"),
+        item(account, "sell", quantity=4, idempotency_key="b"),
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [(r["status"], r["status_code"]) for r in results] == [
+        ("filled", 201), ("rejected", 400), ("rejected", 400), ("rejected", 404), ("filled", 201),
+    ]
+    assert results[1]["error"].startswith("Insufficient stock")
+    assert results[0]["order"]["executed_at"] is not None
+
+    state = await load(client, account)
+    assert Decimal(state["cash"]) == Decimal(account["cash"]) - 6000
+    assert [(s["stock_code"], s["quantity"]) for s in state["stocks"]] == [("005930", 6)]
+
+
+async def test_batch_replays_keys_from_earlier_requests_and_within_the_batch(client, account):
+    first = await client.post("/order/batch", json={"orders": [item(account, "buy", idempotency_key="a")]})
+
+    response = await client.post("/order/batch", json={"orders": [
+        item(account, "buy", price=1010, idempotency_key="a"),
+        item(account, "buy", idempotency_key="b"),
+        item(account, "buy", price=990, idempotency_key="b"),
+        item(account, "sell", idempotency_key="b"),
+    ]})
+
+    results = response.json()
+    assert [(r["status"], r["status_code"]) for r in results] == [
+        ("replayed", 200), ("filled", 201), ("replayed", 200), ("rejected", 409),
+    ]
+    assert results[0]["order"]["id"] == first.json()[0]["order"]["id"]
+    assert Decimal(results[0]["order"]["price"]) == Decimal(results[2]["order"]["price"]) == Decimal("1000")
+    assert results[2]["order"]["id"] == results[1]["order"]["id"]
+    assert Decimal((await load(client, account))["cash"]) == Decimal(account["cash"]) - 20000
+
+
+async def test_holding_sold_out_within_a_batch_is_removed(client, account):
+    await client.post("/order/batch", json={"orders": [
+        item(account, "buy"),
+        item(account, "sell"),
+        item(account, "buy", stock_code="000660", quantity=1),
+        item(account, "sell", stock_code="000660", quantity=1),
+        item(account, "buy", stock_code="000660", quantity=2),
+    ]})
+
+    state = await load(client, account)
+    assert [(s["stock_code"], s["quantity"]) for s in state["stocks"]] == [("000660", 2)]
+    assert Decimal(state["cash"]) == Decimal(account["cash"]) - 2000
+
+
+async def test_batch_size_is_bounded(client, account):
+    response = await client.post("/order/batch", json={"orders": [item(account, "buy", quantity=1)] * 1001})
+    assert response.status_code == 422
@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def order(account, **fields):
+    return {"user_id": account["user_id"], "stock_code": "005930", "price": 1000, "quantity": 10, **fields}
+
+
+async def cash(client, account) -> Decimal:
+    return Decimal((await client.get(f"/account/{account['user_id']}")).json()["cash"])
+
+
+async def test_retried_buy_replays_the_original_fill(client, account):
+    first = await client.post("/order/buy", json=order(account, idempotency_key="buy:1"))
+    retry = await client.post("/order/buy", json=order(account, idempotency_key="buy:1"))
+
+    assert (first.status_code, retry.status_code) == (201, 200)
+    assert retry.json() == first.json()
+    assert await cash(client, account) == Decimal(account["cash"]) - 10000
+
+
+async def test_retry_at_a_new_price_gets_the_original_fill_price(client, account):
+    await client.post("/order/buy", json=order(account))
+    first = await client.post("/order/sell", json=order(account, price=1030, idempotency_key="sell:1"))
+    retry = await client.post("/order/sell", json=order(account, price=1060, idempotency_key="sell:1"))
+
+    assert retry.status_code == 200
+    assert Decimal(retry.json()["price"]) == Decimal(first.json()["price"]) == Decimal("1030")
+    assert await cash(client, account) == Decimal(account["cash"]) + 300
+
+
+async def test_key_reused_for_a_different_order_conflicts(client, account):
+    await client.post("/order/buy", json=order(account, idempotency_key="buy:1"))
+
+    response = await client.post("/order/buy", json=order(account, quantity=5, idempotency_key="buy:1"))
+    assert response.status_code == 409
+
+    response = await client.post("/order/sell", json=order(account, idempotency_key="buy:1"))
+    assert response.status_code == 409
+    assert await cash(client, account) == Decimal(account["cash"]) - 10000
+
+
+async def test_orders_without_a_key_always_execute(client, account):
+    await client.post("/order/buy", json=order(account))
+    await client.post("/order/buy", json=order(account))
+
+    assert await cash(client, account) == Decimal(account["cash"]) - 20000
+
+
+async def test_keys_are_scoped_to_their_account(client, account):
+    other = (await client.post("/account/create", json={"user_id": "6f1c1f6e-3e6b-4b7e-9a57-0c2d7f1c2b11"})).json()
+
+    first = await client.post("/order/buy", json=order(account, idempotency_key="buy:1"))
+    second = await client.post("/order/buy", json=order(other, idempotency_key="buy:1"))
+
+    assert second.status_code == 201
+    assert second.json()["id"] != first.json()["id"]
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import engine
+from app.engine.price_history_writer import PriceHistoryWriter
+from app.models.price_history import SimPriceHistory
+
+pytestmark = pytest.mark.anyio
+
+
+async def history_rows(db) -> int:
+    return await db.scalar(select(func.count(SimPriceHistory.id)))
+
+
+async def test_failed_flush_is_retried_with_the_next_one(db):
+    writer = PriceHistoryWriter(max_batch_size=1000, flush_interval=3600, max_buffered=1000)
+    start = datetime(2024, 1, 1)
+    await writer.record({"005930": 70000.0, "000660": 120000.0}, start)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SimPriceHistory.__table__.drop)
+    await writer.flush()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SimPriceHistory.__table__.create)
+    await writer.record({"005930": 70100.0, "000660": 120500.0}, start + timedelta(seconds=5))
+    await writer.flush()
+
+    assert await history_rows(db) == 4
+
+
+async def test_requeued_rows_are_capped_to_the_newest(db):
+    writer = PriceHistoryWriter(max_batch_size=1000, flush_interval=3600, max_buffered=3)
+    start = datetime(2024, 1, 1)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SimPriceHistory.__table__.drop)
+    for second in range(5):
+        await writer.record({"005930": 70000.0 + second}, start + timedelta(seconds=second))
+        await writer.flush()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SimPriceHistory.__table__.create)
+    await writer.flush()
+
+    prices = (await db.scalars(select(SimPriceHistory.price).order_by(SimPriceHistory.timestamp))).all()
+    assert [float(price) for price in prices] == [70002.0, 70003.0, 70004.0]
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+import numpy as np
+
+from app.engine.price_simulator import PriceSimulator
+
+
+def test_paths_of_untracked_codes_do_not_register_them():
+    simulator = PriceSimulator(seed=7)
+    simulator.set_price("005930", Decimal("70000"))
+
+    paths = simulator.generate_paths(["005930", "NOPE01"], 50, seed=1)
+
+    assert paths.shape == (51, 2)
+    assert paths[0, 0] == 70000
+    assert simulator.stock_codes == ["005930"]
+
+
+def test_paths_are_reproducible_and_leave_live_prices_alone():
+    simulator = PriceSimulator(seed=7)
+    simulator.set_price("005930", Decimal("70000"))
+
+    first = simulator.generate_paths(["005930", "NOPE01"], 50, seed=1)
+    second = simulator.generate_paths(["005930", "NOPE01"], 50, seed=1)
+
+    np.testing.assert_array_equal(first, second)
+    assert simulator.get_prices(["005930"]) == {"005930": Decimal("70000.0")}
+
+
+def test_untracked_paths_start_at_the_price_the_code_is_registered_with():
+    for per_ticker_seed in (False, True):
+        simulator = PriceSimulator(seed=7, per_ticker_seed=per_ticker_seed)
+        simulator.get_prices(["005930"])  # advances the shared generator when not seeded per ticker
+
+        paths = simulator.generate_paths(["NOPE01"], 10)
+        assert simulator.get_price("NOPE01") == Decimal(str(paths[0, 0]))